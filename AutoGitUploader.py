@@ -1,101 +1,51 @@
 import os
 import sys
-import tempfile
-import shutil
-import zipfile
-import tarfile
-import requests
-import json
-from pathlib import Path
+import queue
+import threading
+from collections import deque
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QLineEdit, QPushButton, QFileDialog, QTextEdit,
-    QCheckBox, QMessageBox, QProgressBar
+    QLabel, QLineEdit, QPushButton, QFileDialog, QPlainTextEdit,
+    QCheckBox, QMessageBox, QProgressBar, QListWidget
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSettings
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal, QSettings
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QIcon
-import git
+LOG_MAX_LINES = 5000
+LOG_DRAIN_INTERVAL_MS = 33
+LOG_FILE_NAME = "AutoGitUploader.log"
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+LOG_FILE_CHUNK_LINES = 1000
+def load_core():
+    import AutoGitUploaderCore
+    return AutoGitUploaderCore
+def warm_up_imports():
+    load_core()
+    import git
+    import requests
 class WorkerThread(QThread):
-    update_status = pyqtSignal(str)
     update_progress = pyqtSignal(int)
+    update_stats = pyqtSignal(str)
     operation_complete = pyqtSignal(bool, str)
-    def __init__(self, archive_path, repo_name, github_username, github_token, is_private):
+    def __init__(self, job_store, record_id, on_status, *args, **kwargs):
         super().__init__()
-        self.archive_path = archive_path
-        self.repo_name = repo_name
-        self.github_username = github_username
-        self.github_token = github_token
-        self.is_private = is_private
-        self.temp_dir = None
+        self.job_store = job_store
+        self.record_id = record_id
+        self.job = load_core().UploadJob(*args, on_status=on_status, on_progress=self.update_progress.emit, on_stats=self.update_stats.emit, **kwargs)
     def run(self):
         try:
-            self.update_status.emit("Creating temporary directory...")
-            self.temp_dir = tempfile.mkdtemp()
-            self.update_progress.emit(10)
-            self.update_status.emit(f"Extracting {self.archive_path} to temporary directory...")
-            self.extract_archive(self.archive_path, self.temp_dir)
-            self.update_progress.emit(30)
-            self.update_status.emit("Initializing Git repository...")
-            repo = git.Repo.init(self.temp_dir)
-            self.update_progress.emit(40)
-            self.update_status.emit("Adding files to Git...")
-            repo.git.add(A=True)
-            self.update_progress.emit(50)
-            self.update_status.emit("Committing files...")
-            repo.git.commit(m="Initial commit")
-            self.update_progress.emit(60)
-            self.update_status.emit(f"Creating GitHub repository: {self.repo_name}...")
-            repo_url = self.create_github_repo()
-            self.update_progress.emit(70)
-            self.update_status.emit("Pushing to GitHub...")
-            repo.create_remote("origin", repo_url)
-            repo.git.push("origin", "master")
-            self.update_progress.emit(90)
-            self.update_status.emit("Cleaning up temporary files...")
-            self.cleanup()
-            self.update_progress.emit(100)
-            self.operation_complete.emit(True, f"Successfully uploaded to {repo_url}")
+            repo_url = load_core().run_recorded_job(self.job_store, self.record_id, self.job)
         except Exception as e:
-            self.update_status.emit(f"Error: {str(e)}")
             self.operation_complete.emit(False, str(e))
-            self.cleanup()
-    def extract_archive(self, archive_path, extract_to):
-        file_ext = os.path.splitext(archive_path)[1].lower()
-        if file_ext == '.zip':
-            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_to)
-        elif file_ext in ['.tar', '.gz', '.tgz']:
-            with tarfile.open(archive_path, 'r:*') as tar_ref:
-                tar_ref.extractall(extract_to)
-        else:
-            raise ValueError(f"Unsupported archive format: {file_ext}")
-    def create_github_repo(self):
-        url = "https://api.github.com/user/repos"
-        headers = {
-            "Authorization": f"token {self.github_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        data = {
-            "name": self.repo_name,
-            "private": self.is_private
-        }
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        if response.status_code not in [200, 201]:
-            raise Exception(f"Failed to create GitHub repository: {response.json().get('message', response.text)}")
-        return response.json()["html_url"]
-    def cleanup(self):
-        if self.temp_dir and os.path.exists(self.temp_dir):
-            try:
-                shutil.rmtree(self.temp_dir)
-            except Exception as e:
-                self.update_status.emit(f"Warning: Failed to clean up temporary directory: {str(e)}")
+            return
+        self.operation_complete.emit(True, f"Successfully uploaded to {repo_url}")
 class DropAreaWidget(QWidget):
-    file_dropped = pyqtSignal(str)
+    files_dropped = pyqtSignal(list)
     def __init__(self):
         super().__init__()
         self.setAcceptDrops(True)
         self.layout = QVBoxLayout(self)
-        self.label = QLabel("Drag & Drop Archive Here")
+        self.label = QLabel("Drag & Drop Archives Here")
         self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.layout.addWidget(self.label)
         self.setMinimumHeight(100)
@@ -108,16 +58,33 @@ class DropAreaWidget(QWidget):
         self.setStyleSheet("border: 2px dashed #aaa; border-radius: 5px;")
     def dropEvent(self, event: QDropEvent):
         if event.mimeData().hasUrls():
-            url = event.mimeData().urls()[0]
-            file_path = url.toLocalFile()
-            self.file_dropped.emit(file_path)
+            file_paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+            if file_paths:
+                self.files_dropped.emit(file_paths)
             self.setStyleSheet("border: 2px dashed #aaa; border-radius: 5px;")
 class AutoGitUploader(QMainWindow):
+    archive_detected = pyqtSignal(str)
     def __init__(self):
         super().__init__()
         self.settings = QSettings("AutoGitUploader", "settings")
         self.init_ui()
-        self.worker = None
+        self.archive_paths = []
+        self.pending_jobs = []
+        self.workers = {}
+        self.job_progress = {}
+        self.job_results = []
+        self.batch_size = 0
+        self.stage_limits = None
+        self.watcher = None
+        self.job_store = None
+        self.archive_cache = None
+        self.log_queue = deque()
+        self.log_file = None
+        self.log_listener = None
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.drain_log)
+        self.log_timer.start(LOG_DRAIN_INTERVAL_MS)
+        self.archive_detected.connect(self.on_archive_detected)
         self.load_settings()
     def init_ui(self):
         self.setWindowTitle("AutoGitUploader")
@@ -125,7 +92,7 @@ class AutoGitUploader(QMainWindow):
         main_widget = QWidget()
         main_layout = QVBoxLayout(main_widget)
         self.drop_area = DropAreaWidget()
-        self.drop_area.file_dropped.connect(self.set_archive_path)
+        self.drop_area.files_dropped.connect(self.set_archive_paths)
         main_layout.addWidget(self.drop_area)
         archive_layout = QHBoxLayout()
         archive_layout.addWidget(QLabel("Archive:"))
@@ -145,6 +112,7 @@ class AutoGitUploader(QMainWindow):
         github_token_layout.addWidget(QLabel("GitHub Token:"))
         self.github_token_edit = QLineEdit()
         self.github_token_edit.setEchoMode(QLineEdit.EchoMode.Password)
+        self.github_token_edit.editingFinished.connect(self.start_pending_jobs)
         github_token_layout.addWidget(self.github_token_edit)
         main_layout.addLayout(github_token_layout)
         repo_name_layout = QHBoxLayout()
@@ -155,9 +123,28 @@ class AutoGitUploader(QMainWindow):
         private_repo_layout = QHBoxLayout()
         self.private_repo_checkbox = QCheckBox("Private Repository")
         private_repo_layout.addWidget(self.private_repo_checkbox)
+        self.update_existing_checkbox = QCheckBox("Update existing repository (upload only changes)")
+        private_repo_layout.addWidget(self.update_existing_checkbox)
         private_repo_layout.addStretch()
         main_layout.addLayout(private_repo_layout)
+        watch_folder_layout = QHBoxLayout()
+        self.watch_folder_checkbox = QCheckBox("Watch folder:")
+        self.watch_folder_checkbox.toggled.connect(self.toggle_watch_folder)
+        watch_folder_layout.addWidget(self.watch_folder_checkbox)
+        self.watch_folder_edit = QLineEdit()
+        self.watch_folder_edit.setReadOnly(True)
+        watch_folder_layout.addWidget(self.watch_folder_edit)
+        self.watch_folder_button = QPushButton("Choose")
+        self.watch_folder_button.clicked.connect(self.browse_watch_folder)
+        watch_folder_layout.addWidget(self.watch_folder_button)
+        main_layout.addLayout(watch_folder_layout)
         save_username_layout = QHBoxLayout()
+        apply_excludes_layout = QHBoxLayout()
+        self.apply_excludes_checkbox = QCheckBox("Skip build artifacts and files ignored by the archive's .gitignore")
+        self.apply_excludes_checkbox.setChecked(True)
+        apply_excludes_layout.addWidget(self.apply_excludes_checkbox)
+        apply_excludes_layout.addStretch()
+        main_layout.addLayout(apply_excludes_layout)
         self.save_username_checkbox = QCheckBox("Remember GitHub Username")
         self.save_username_checkbox.setChecked(True)
         save_username_layout.addWidget(self.save_username_checkbox)
@@ -167,9 +154,16 @@ class AutoGitUploader(QMainWindow):
         self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(0)
         main_layout.addWidget(self.progress_bar)
+        self.progress_stats_label = QLabel("")
+        main_layout.addWidget(self.progress_stats_label)
+        main_layout.addWidget(QLabel("Queue:"))
+        self.queue_list = QListWidget()
+        self.queue_list.setMaximumHeight(100)
+        main_layout.addWidget(self.queue_list)
         main_layout.addWidget(QLabel("Status:"))
-        self.status_text = QTextEdit()
+        self.status_text = QPlainTextEdit()
         self.status_text.setReadOnly(True)
+        self.status_text.setMaximumBlockCount(LOG_MAX_LINES)
         self.status_text.setMinimumHeight(150)
         main_layout.addWidget(self.status_text)
         self.upload_button = QPushButton("Upload to GitHub")
@@ -183,7 +177,7 @@ class AutoGitUploader(QMainWindow):
                 background-color: #2d2d2d;
                 color: #ffffff;
             }
-            QLineEdit, QTextEdit {
+            QLineEdit, QPlainTextEdit, QListWidget {
                 background-color: #3d3d3d;
                 border: 1px solid #555555;
                 color: #ffffff;
@@ -222,77 +216,280 @@ class AutoGitUploader(QMainWindow):
             }
         """)
     def browse_archive(self):
-        file_filter = "Archives (*.zip *.tar *.gz *.tgz);;All Files (*)"
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, "Select Archive", "", file_filter
+        file_filter = "Archives (*.zip *.7z *.tar *.gz *.tgz *.bz2 *.tbz2 *.xz *.txz *.zst *.tzst);;All Files (*)"
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "Select Archives", "", file_filter
         )
-        if file_path:
-            self.set_archive_path(file_path)
+        if file_paths:
+            self.set_archive_paths(file_paths)
+    def set_archive_paths(self, paths):
+        if len(paths) == 1:
+            self.set_archive_path(paths[0])
+            return
+        self.archive_paths = paths
+        self.archive_path_edit.setText(f"{len(paths)} archives: " + ", ".join(os.path.basename(path) for path in paths))
+        self.repo_name_edit.clear()
+        self.repo_name_edit.setPlaceholderText("Named after each archive")
+        self.repo_name_edit.setEnabled(False)
     def set_archive_path(self, path):
+        self.archive_paths = [path]
         self.archive_path_edit.setText(path)
+        self.repo_name_edit.setPlaceholderText("")
+        self.repo_name_edit.setEnabled(True)
         try:
             file_name = os.path.basename(path)
-            base_name = os.path.splitext(file_name)[0]
+            base_name = load_core().archive_base_name(file_name)
             if base_name and not self.repo_name_edit.text():
                 self.repo_name_edit.setText(base_name)
         except:
             pass
     def upload_to_github(self):
-        archive_path = self.archive_path_edit.text()
+        core = load_core()
+        archive_paths = self.archive_paths
         repo_name = self.repo_name_edit.text()
-        github_username = self.github_username_edit.text()
-        github_token = self.github_token_edit.text()
-        is_private = self.private_repo_checkbox.isChecked()
-        if not archive_path:
+        if not archive_paths:
             QMessageBox.warning(self, "Error", "Please select an archive file.")
             return
-        if not os.path.exists(archive_path):
-            QMessageBox.warning(self, "Error", "Selected archive file does not exist.")
+        missing = [path for path in archive_paths if not os.path.exists(path)]
+        if missing:
+            QMessageBox.warning(self, "Error", f"Selected archive file does not exist: {missing[0]}")
             return
-        if not repo_name:
-            QMessageBox.warning(self, "Error", "Please enter a repository name.")
+        if len(archive_paths) == 1:
+            if not repo_name:
+                QMessageBox.warning(self, "Error", "Please enter a repository name.")
+                return
+            jobs = [(archive_paths[0], repo_name)]
+        else:
+            jobs = [(path, core.archive_base_name(os.path.basename(path))) for path in archive_paths]
+        if not self.check_credentials():
             return
+        self.enqueue_jobs(jobs)
+        self.archive_paths = []
+        self.archive_path_edit.clear()
+        self.repo_name_edit.clear()
+        self.repo_name_edit.setPlaceholderText("")
+        self.repo_name_edit.setEnabled(True)
+    def check_credentials(self):
+        github_username = self.github_username_edit.text()
         if not github_username:
             QMessageBox.warning(self, "Error", "Please enter your GitHub username.")
-            return
-        if not github_token:
+            return False
+        if not self.github_token_edit.text():
             QMessageBox.warning(self, "Error", "Please enter your GitHub token.")
-            return
+            return False
         if self.save_username_checkbox.isChecked():
             self.settings.setValue("github_username", github_username)
         else:
             self.settings.remove("github_username")
-        self.status_text.clear()
+        return True
+    def get_job_store(self):
+        if self.job_store is None:
+            core = load_core()
+            self.job_store = core.JobStore(self.settings.value("job_db", "") or core.default_job_store_path())
+            self.archive_cache = core.ArchiveCache(self.job_store)
+        return self.job_store
+    def start_batch_if_idle(self):
+        if self.workers or self.pending_jobs:
+            return
+        core = load_core()
+        if not self.watcher:
+            self.drain_log()
+            self.status_text.clear()
+            self.queue_list.clear()
         self.progress_bar.setValue(0)
-        self.set_ui_enabled(False)
-        self.worker = WorkerThread(archive_path, repo_name, github_username, github_token, is_private)
-        self.worker.update_status.connect(self.update_status)
-        self.worker.update_progress.connect(self.progress_bar.setValue)
-        self.worker.operation_complete.connect(self.on_operation_complete)
-        self.worker.start()
+        self.progress_stats_label.clear()
+        self.job_progress = {}
+        self.job_results = []
+        self.batch_size = 0
+        self.stage_limits = core.StageLimits(
+            self.settings.value("cpu_stage_slots", core.DEFAULT_CPU_STAGE_SLOTS, type=int),
+            self.settings.value("network_stage_slots", core.DEFAULT_NETWORK_STAGE_SLOTS, type=int)
+        )
+        core.configure_api_client(
+            self.settings.value("api_connect_timeout", core.DEFAULT_API_CONNECT_TIMEOUT, type=float),
+            self.settings.value("api_read_timeout", core.DEFAULT_API_READ_TIMEOUT, type=float)
+        )
+    def enqueue_jobs(self, jobs):
+        core = load_core()
+        github_username = self.github_username_edit.text()
+        github_token = self.github_token_edit.text()
+        is_private = self.private_repo_checkbox.isChecked()
+        self.start_batch_if_idle()
+        apply_excludes = self.apply_excludes_checkbox.isChecked()
+        self.settings.setValue("apply_excludes", apply_excludes)
+        self.settings.setValue("update_existing", self.update_existing_checkbox.isChecked())
+        exclude_patterns = self.settings.value("exclude_patterns", "\n".join(core.DEFAULT_EXCLUDE_PATTERNS)).splitlines() if apply_excludes else []
+        options = dict(
+            engine=self.settings.value("engine", "fast-import"),
+            extract_workers=self.settings.value("extract_workers", 0, type=int),
+            scratch_dir=self.settings.value("scratch_dir", "") or None,
+            ram_budget=self.settings.value("scratch_ram_budget_mb", core.DEFAULT_RAM_BUDGET_MB, type=int) * 1024 * 1024,
+            exclude_patterns=exclude_patterns,
+            use_archive_gitignore=apply_excludes,
+            use_lfs=self.settings.value("use_lfs", True, type=bool),
+            lfs_threshold=self.settings.value("lfs_threshold_mb", core.DEFAULT_LFS_THRESHOLD_MB, type=int) * 1024 * 1024,
+            lfs_url=self.settings.value("lfs_url", "") or None,
+            lfs_workers=self.settings.value("lfs_workers", core.DEFAULT_LFS_WORKERS, type=int),
+            object_format=self.settings.value("object_format", "pack"),
+            push_chunk_size=self.settings.value("push_chunk_mb", core.DEFAULT_PUSH_CHUNK_MB, type=int) * 1024 * 1024,
+            object_store=(self.settings.value("object_store", "") or core.default_object_store_path()) if self.settings.value("use_object_store", True, type=bool) else None,
+            object_store_max_size=self.settings.value("object_store_max_mb", core.DEFAULT_OBJECT_STORE_MAX_MB, type=int) * 1024 * 1024,
+            update_existing=self.update_existing_checkbox.isChecked()
+        )
+        job_store = self.get_job_store()
+        for archive_path, job_repo_name in jobs:
+            record_id = job_store.add(archive_path, job_repo_name, github_username, is_private, options)
+            self.queue_list.addItem(f"Queued: {job_repo_name} ({os.path.basename(archive_path)})")
+            self.pending_jobs.append((self.queue_list.count() - 1, record_id, archive_path, job_repo_name, github_username, github_token, is_private, options))
+        self.batch_size += len(jobs)
+        self.start_pending_jobs()
+    def restore_jobs(self):
+        core = load_core()
+        core.SCRATCH_REAPER.sweep(core.job_scratch_roots(self.settings.value("scratch_dir", "") or None))
+        job_store = self.get_job_store()
+        records = job_store.incomplete()
+        restored = 0
+        for record in records:
+            if not job_store.claim(record):
+                continue
+            if not os.path.exists(record["archive_path"]):
+                job_store.update(record["id"], state="failed", error="Archive no longer exists")
+                continue
+            self.start_batch_if_idle()
+            (archive_path, repo_name, github_username, is_private), options = core.restore_job_arguments(record)
+            self.queue_list.addItem(f"Queued (resumed): {repo_name} ({os.path.basename(archive_path)})")
+            self.pending_jobs.append((self.queue_list.count() - 1, record["id"], archive_path, repo_name, github_username, None, is_private, options))
+            self.batch_size += 1
+            restored += 1
+        if restored:
+            self.update_status(f"Re-enqueued {restored} unfinished uploads from the previous session")
+            self.start_pending_jobs()
+    def start_pending_jobs(self):
+        parallel_jobs = max(self.settings.value("parallel_jobs", load_core().DEFAULT_PARALLEL_JOBS, type=int), 1)
+        while self.pending_jobs and len(self.workers) < parallel_jobs:
+            row, record_id, archive_path, repo_name, github_username, github_token, is_private, options = self.pending_jobs[0]
+            github_token = github_token or self.github_token_edit.text()
+            if not github_token:
+                self.update_status(f"{len(self.pending_jobs)} queued uploads are waiting for a GitHub token")
+                return
+            self.pending_jobs.pop(0)
+            worker = WorkerThread(
+                self.job_store, record_id,
+                lambda message, repo_name=repo_name: self.update_status(f"[{repo_name}] {message}" if self.batch_size > 1 else message),
+                archive_path, repo_name, github_username, github_token, is_private,
+                limits=self.stage_limits, cache=self.archive_cache, **options
+            )
+            worker.update_progress.connect(lambda value, row=row: self.update_job_progress(row, value))
+            worker.update_stats.connect(lambda text, repo_name=repo_name: self.progress_stats_label.setText(f"{repo_name}: {text}" if self.batch_size > 1 else text))
+            worker.operation_complete.connect(lambda success, message, row=row, repo_name=repo_name: self.on_operation_complete(row, repo_name, success, message))
+            self.workers[row] = worker
+            self.queue_list.item(row).setText(f"Running: {repo_name} ({os.path.basename(archive_path)})")
+            worker.start()
+    def browse_watch_folder(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select Folder to Watch", self.watch_folder_edit.text())
+        if directory:
+            self.watch_folder_edit.setText(directory)
+            self.settings.setValue("watch_dir", directory)
+            if self.watcher:
+                self.toggle_watch_folder(False)
+                self.toggle_watch_folder(True)
+    def toggle_watch_folder(self, enabled):
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+            self.update_status("Stopped watching for new archives")
+        if not enabled:
+            return
+        directory = self.watch_folder_edit.text()
+        if not directory or not os.path.isdir(directory):
+            QMessageBox.warning(self, "Error", "Please choose an existing folder to watch.")
+            self.watch_folder_checkbox.setChecked(False)
+            return
+        if not self.check_credentials():
+            self.watch_folder_checkbox.setChecked(False)
+            return
+        core = load_core()
+        self.watcher = core.FolderWatcher(
+            directory, self.archive_detected.emit,
+            self.settings.value("watch_debounce", core.WATCH_DEBOUNCE, type=float),
+            self.settings.value("watch_poll_interval", core.WATCH_POLL_INTERVAL, type=float)
+        )
+        self.watcher.start()
+        self.update_status(f"Watching {directory} for new archives")
+    def on_archive_detected(self, path):
+        self.update_status(f"New archive detected: {path}")
+        self.enqueue_jobs([(path, load_core().archive_base_name(os.path.basename(path)))])
+    def update_job_progress(self, row, value):
+        self.job_progress[row] = value
+        self.progress_bar.setValue(sum(self.job_progress.values()) // max(self.batch_size, 1))
     def update_status(self, message):
-        self.status_text.append(message)
+        self.log_queue.append(message)
+    def get_log_file(self):
+        if self.log_file is None:
+            import logging
+            import logging.handlers
+            log_dir = load_core().user_data_dir()
+            os.makedirs(log_dir, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(os.path.join(log_dir, LOG_FILE_NAME), maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            records = queue.SimpleQueue()
+            self.log_listener = logging.handlers.QueueListener(records, handler)
+            self.log_listener.start()
+            self.log_file = logging.getLogger("AutoGitUploader")
+            self.log_file.propagate = False
+            self.log_file.setLevel(logging.INFO)
+            self.log_file.addHandler(logging.handlers.QueueHandler(records))
+        return self.log_file
+    def drain_log(self):
+        if not self.log_queue:
+            return
+        messages = []
+        while self.log_queue:
+            messages.append(self.log_queue.popleft())
+        try:
+            log_file = self.get_log_file()
+        except OSError:
+            log_file = None
+        if log_file:
+            for start in range(0, len(messages), LOG_FILE_CHUNK_LINES):
+                log_file.info("\n".join(messages[start:start + LOG_FILE_CHUNK_LINES]))
+        self.status_text.appendPlainText("\n".join(messages[-LOG_MAX_LINES:]))
         scrollbar = self.status_text.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
-    def on_operation_complete(self, success, message):
-        self.set_ui_enabled(True)
-        if success:
-            QMessageBox.information(self, "Success", message)
+    def on_operation_complete(self, row, repo_name, success, message):
+        self.workers.pop(row).wait()
+        self.job_results.append((repo_name, success, message))
+        self.update_job_progress(row, 100 if success else self.job_progress.get(row, 0))
+        self.queue_list.item(row).setText(f"{'Done' if success else 'Failed'}: {repo_name} - {message}")
+        self.start_pending_jobs()
+        if self.workers or self.pending_jobs or self.watcher:
+            return
+        if len(self.job_results) == 1:
+            if success:
+                QMessageBox.information(self, "Success", message)
+            else:
+                QMessageBox.critical(self, "Error", f"Operation failed: {message}")
+            return
+        failed = [result for result in self.job_results if not result[1]]
+        summary = f"Uploaded {len(self.job_results) - len(failed)} of {len(self.job_results)} archives."
+        if failed:
+            summary += "\n\nFailed:\n" + "\n".join(f"{name}: {error}" for name, _, error in failed)
+            QMessageBox.warning(self, "Batch Finished", summary)
         else:
-            QMessageBox.critical(self, "Error", f"Operation failed: {message}")
-    def set_ui_enabled(self, enabled):
-        self.browse_button.setEnabled(enabled)
-        self.github_username_edit.setEnabled(enabled)
-        self.github_token_edit.setEnabled(enabled)
-        self.repo_name_edit.setEnabled(enabled)
-        self.private_repo_checkbox.setEnabled(enabled)
-        self.save_username_checkbox.setEnabled(enabled)
-        self.upload_button.setEnabled(enabled)
+            QMessageBox.information(self, "Batch Finished", summary)
     def load_settings(self):
         github_username = self.settings.value("github_username", "")
         if github_username:
             self.github_username_edit.setText(github_username)
+        self.apply_excludes_checkbox.setChecked(self.settings.value("apply_excludes", True, type=bool))
+        self.update_existing_checkbox.setChecked(self.settings.value("update_existing", False, type=bool))
+        self.watch_folder_edit.setText(self.settings.value("watch_dir", ""))
     def closeEvent(self, event):
+        if self.watcher:
+            self.watcher.stop()
+        self.drain_log()
+        if self.log_listener:
+            self.log_listener.stop()
         if self.save_username_checkbox.isChecked():
             self.settings.setValue("github_username", self.github_username_edit.text())
         super().closeEvent(event)
@@ -300,4 +497,6 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = AutoGitUploader()
     window.show()
+    QTimer.singleShot(0, lambda: threading.Thread(target=warm_up_imports, daemon=True).start())
+    QTimer.singleShot(0, window.restore_jobs)
     sys.exit(app.exec()) 
@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from AutoGitUploaderCore import (
+    UploadJob, StageLimits, FolderWatcher, JobStore, ArchiveCache, archive_base_name, configure_api_client,
+    default_job_store_path, default_object_store_path, run_recorded_job, restore_job_arguments, archive_fingerprint,
+    job_scratch_roots, SCRATCH_REAPER,
+    DEFAULT_RAM_BUDGET_MB, DEFAULT_EXCLUDE_PATTERNS, DEFAULT_LFS_THRESHOLD_MB, DEFAULT_LFS_WORKERS,
+    DEFAULT_PUSH_CHUNK_MB, DEFAULT_API_CONNECT_TIMEOUT, DEFAULT_API_READ_TIMEOUT,
+    DEFAULT_OBJECT_STORE_MAX_MB, DEFAULT_PARALLEL_JOBS, DEFAULT_CPU_STAGE_SLOTS, DEFAULT_NETWORK_STAGE_SLOTS, WATCH_DEBOUNCE, WATCH_POLL_INTERVAL
+)
+OUTPUT_LOCK = threading.Lock()
+def emit_event(event, **fields):
+    with OUTPUT_LOCK:
+        sys.stdout.write(json.dumps(dict(event=event, **fields)) + "\n")
+        sys.stdout.flush()
+def add_job_arguments(parser):
+    parser.add_argument("--private", action="store_true")
+    parser.add_argument("--update", action="store_true", help="if the repository already exists, push only what changed as a new commit")
+    parser.add_argument("--username", default=os.environ.get("GITHUB_USERNAME") or os.environ.get("GITHUB_USER"), help="GitHub username (default: $GITHUB_USERNAME)")
+    parser.add_argument("--token", default=os.environ.get("GITHUB_TOKEN"), help="GitHub token (default: $GITHUB_TOKEN)")
+    parser.add_argument("--engine", choices=["fast-import", "checkout"], default="fast-import")
+    parser.add_argument("--object-format", choices=["pack", "loose"], default="pack")
+    parser.add_argument("--extract-workers", type=int, default=0)
+    parser.add_argument("--scratch-dir")
+    parser.add_argument("--ram-budget-mb", type=int, default=DEFAULT_RAM_BUDGET_MB)
+    parser.add_argument("--exclude", action="append", default=[], metavar="PATTERN", help="extra gitignore-style pattern to skip (repeatable)")
+    parser.add_argument("--no-excludes", action="store_true", help="upload build artifacts and files ignored by the archive's .gitignore")
+    parser.add_argument("--no-lfs", action="store_true")
+    parser.add_argument("--lfs-threshold-mb", type=int, default=DEFAULT_LFS_THRESHOLD_MB)
+    parser.add_argument("--lfs-url")
+    parser.add_argument("--lfs-workers", type=int, default=DEFAULT_LFS_WORKERS)
+    parser.add_argument("--push-chunk-mb", type=int, default=DEFAULT_PUSH_CHUNK_MB)
+    parser.add_argument("--connect-timeout", type=float, default=DEFAULT_API_CONNECT_TIMEOUT)
+    parser.add_argument("--read-timeout", type=float, default=DEFAULT_API_READ_TIMEOUT)
+    parser.add_argument("--no-cache", action="store_true", help="upload even if an identical archive was uploaded before")
+    parser.add_argument("--object-store", default=default_object_store_path(), help="bare repository whose objects every upload reuses (default: %(default)s)")
+    parser.add_argument("--no-object-store", action="store_true", help="do not share objects between uploads")
+    parser.add_argument("--object-store-max-mb", type=int, default=DEFAULT_OBJECT_STORE_MAX_MB, help="size above which the least recently used packs are dropped")
+    parser.add_argument("--progress", action="store_true", help="also emit progress and throughput events")
+def build_parser():
+    parser = argparse.ArgumentParser(prog="autogituploader", description="Upload a project archive to a new GitHub repository.")
+    parser.add_argument("--db", help="job queue and history database (default: %(default)s)", default=default_job_store_path())
+    commands = parser.add_subparsers(dest="command", required=True)
+    upload = commands.add_parser("upload", help="upload an archive to a new repository")
+    upload.add_argument("archive")
+    upload.add_argument("--name", help="repository name (default: archive name without extension)")
+    add_job_arguments(upload)
+    watch = commands.add_parser("watch", help="upload every archive that lands in a directory")
+    watch.add_argument("directory")
+    watch.add_argument("--max-jobs", type=int, default=DEFAULT_PARALLEL_JOBS, help="uploads to run at the same time")
+    watch.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE, help="seconds an archive's size must stay unchanged before it is uploaded")
+    watch.add_argument("--poll-interval", type=float, default=WATCH_POLL_INTERVAL)
+    watch.add_argument("--include-existing", action="store_true", help="also upload archives already in the directory")
+    add_job_arguments(watch)
+    jobs = commands.add_parser("jobs", help="list recorded upload jobs")
+    jobs.add_argument("--state", choices=["queued", "running", "succeeded", "failed"])
+    jobs.add_argument("--repo", help="only jobs for this repository name")
+    jobs.add_argument("--archive", help="only jobs for this archive's contents")
+    return parser
+def check_credentials(args):
+    if not args.username or not args.token:
+        raise ValueError("GitHub username and token are required (--username/--token or $GITHUB_USERNAME/$GITHUB_TOKEN)")
+    configure_api_client(args.connect_timeout, args.read_timeout)
+def job_options(args):
+    return dict(
+        engine=args.engine,
+        extract_workers=args.extract_workers,
+        scratch_dir=args.scratch_dir,
+        ram_budget=args.ram_budget_mb * 1024 * 1024,
+        exclude_patterns=[] if args.no_excludes else DEFAULT_EXCLUDE_PATTERNS + args.exclude,
+        use_archive_gitignore=not args.no_excludes,
+        use_lfs=not args.no_lfs,
+        lfs_threshold=args.lfs_threshold_mb * 1024 * 1024,
+        lfs_url=args.lfs_url,
+        lfs_workers=args.lfs_workers,
+        object_format=args.object_format,
+        push_chunk_size=args.push_chunk_mb * 1024 * 1024,
+        object_store=None if args.no_object_store else args.object_store,
+        object_store_max_size=args.object_store_max_mb * 1024 * 1024,
+        update_existing=args.update
+    )
+def run_job(args, store, record_id, archive_path, repo_name, is_private, options, limits=None):
+    last_percent = []
+    def on_progress(percent):
+        if not last_percent or percent != last_percent[-1]:
+            last_percent.append(percent)
+            emit_event("progress", archive=archive_path, percent=percent)
+    job = UploadJob(
+        archive_path, repo_name, args.username, args.token, is_private,
+        limits=limits,
+        cache=None if args.no_cache else ArchiveCache(store),
+        on_status=lambda message: emit_event("status", archive=archive_path, message=message),
+        on_progress=on_progress if args.progress else None,
+        on_stats=(lambda text: emit_event("stats", archive=archive_path, message=text)) if args.progress else None,
+        **options
+    )
+    try:
+        repo_url = run_recorded_job(store, record_id, job)
+    except Exception as e:
+        emit_event("result", success=False, archive=archive_path, repository=repo_name, error=str(e))
+        return False
+    emit_event("result", success=True, archive=archive_path, repository=repo_name, url=repo_url)
+    return True
+def upload(args):
+    if not os.path.exists(args.archive):
+        raise ValueError(f"Archive does not exist: {args.archive}")
+    check_credentials(args)
+    SCRATCH_REAPER.sweep(job_scratch_roots(args.scratch_dir))
+    store = JobStore(args.db)
+    repo_name = args.name or archive_base_name(os.path.basename(args.archive))
+    options = job_options(args)
+    record_id = store.add(args.archive, repo_name, args.username, args.private, options)
+    return run_job(args, store, record_id, args.archive, repo_name, args.private, options)
+def watch(args):
+    from concurrent.futures import ThreadPoolExecutor
+    if not os.path.isdir(args.directory):
+        raise ValueError(f"Directory does not exist: {args.directory}")
+    check_credentials(args)
+    SCRATCH_REAPER.sweep(job_scratch_roots(args.scratch_dir))
+    store = JobStore(args.db)
+    limits = StageLimits(DEFAULT_CPU_STAGE_SLOTS, DEFAULT_NETWORK_STAGE_SLOTS)
+    options = job_options(args)
+    with ThreadPoolExecutor(max_workers=max(args.max_jobs, 1)) as executor:
+        for record in store.incomplete():
+            if record["github_username"] != args.username or not os.path.exists(record["archive_path"]) or not store.claim(record):
+                continue
+            (archive_path, repo_name, _, is_private), restored_options = restore_job_arguments(record)
+            emit_event("queued", archive=archive_path, resumed=True)
+            executor.submit(run_job, args, store, record["id"], archive_path, repo_name, is_private, restored_options, limits)
+        def on_archive(path):
+            repo_name = archive_base_name(os.path.basename(path))
+            record_id = store.add(path, repo_name, args.username, args.private, options)
+            emit_event("queued", archive=path)
+            executor.submit(run_job, args, store, record_id, path, repo_name, args.private, options, limits)
+        watcher = FolderWatcher(args.directory, on_archive, args.debounce, args.poll_interval, args.include_existing)
+        watcher.start()
+        emit_event("watching", directory=os.path.abspath(args.directory))
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            emit_event("stopping", directory=os.path.abspath(args.directory))
+        finally:
+            watcher.stop()
+    return True
+def list_jobs(args):
+    store = JobStore(args.db)
+    archive_hash = archive_fingerprint(args.archive) if args.archive else None
+    for record in store.find(archive_hash=archive_hash, repo_name=args.repo, state=args.state):
+        fields = {key: record[key] for key in record.keys() if key != "options"}
+        emit_event("job", **fields)
+    return True
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        succeeded = {"upload": upload, "watch": watch, "jobs": list_jobs}[args.command](args)
+    except Exception as e:
+        emit_event("result", success=False, archive=getattr(args, "archive", None), error=str(e))
+        return 1
+    finally:
+        SCRATCH_REAPER.wait()
+    return 0 if succeeded else 1
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2411 @@
+import os
+import sys
+import stat
+import time
+import tempfile
+import shutil
+import subprocess
+import io
+import re
+import contextlib
+import heapq
+import hashlib
+import zlib
+import struct
+import queue
+import threading
+import json
+import random
+GIT_FILE_MODE = "100644"
+GIT_EXEC_MODE = "100755"
+GIT_LINK_MODE = "120000"
+COPY_CHUNK_SIZE = 1024 * 1024
+PARALLEL_EXTRACT_MIN_MEMBERS = 256
+PARALLEL_EXTRACT_MIN_BYTES = 64 * 1024 * 1024
+UNITS_PER_EXTRACT_WORKER = 4
+RAM_SCRATCH_DIR = "/dev/shm"
+RAM_SCRATCH_HEADROOM = 1.25
+DEFAULT_RAM_BUDGET_MB = 1024
+SNIFF_SIZE = 512
+GITHUB_FILE_SIZE_LIMIT = 100 * 1024 * 1024
+DEFAULT_LFS_THRESHOLD_MB = 50
+DEFAULT_LFS_WORKERS = 4
+LFS_BATCH_SIZE = 100
+LFS_MEDIA_TYPE = "application/vnd.git-lfs+json"
+LFS_ATTRIBUTES = "filter=lfs diff=lfs merge=lfs -text"
+DISK_SPACE_HEADROOM = 1.1
+DEFAULT_EXCLUDE_PATTERNS = [
+    "node_modules/",
+    "__pycache__/",
+    "*.py[cod]",
+    "build/",
+    ".venv/",
+    "venv/",
+    ".tox/",
+    ".DS_Store",
+    "Thumbs.db",
+    "*.o",
+    "*.obj",
+    "*.class",
+    "*.exe",
+    "*.dll",
+    "*.iso",
+    "*.dmg",
+]
+PROGRESS_INTERVAL = 0.25
+LOOSE_OBJECT_COMPRESSION = 1
+PACK_COMPRESSION = zlib.Z_DEFAULT_COMPRESSION
+PACK_OBJECT_TYPES = {"commit": 1, "tree": 2, "blob": 3}
+PACK_LARGE_OFFSET = 0x80000000
+PIPELINE_DEPTH = 64
+DEFAULT_PUSH_CHUNK_MB = 1024
+PUSH_ATTEMPTS = 3
+PUSH_RETRY_DELAY = 5
+PUSH_CHECKPOINT_FILE = "autogituploader-push.json"
+GITHUB_API_URL = "https://api.github.com"
+DEFAULT_API_CONNECT_TIMEOUT = 10
+DEFAULT_API_READ_TIMEOUT = 60
+API_POOL_SIZE = 16
+API_REQUEST_RATE = 10
+API_REQUEST_BURST = 20
+API_CREATE_RATE = 80 / 60
+API_CREATE_BURST = 5
+API_RETRY_ATTEMPTS = 6
+API_BACKOFF_BASE = 2
+API_BACKOFF_MAX = 300
+DEFAULT_PARALLEL_JOBS = 4
+DEFAULT_CPU_STAGE_SLOTS = 2
+DEFAULT_NETWORK_STAGE_SLOTS = 4
+WATCH_DEBOUNCE = 5
+WATCH_POLL_INTERVAL = 2
+INOTIFY_CLOSE_WRITE = 0x8
+INOTIFY_MOVED_TO = 0x80
+INOTIFY_EVENT = struct.Struct("iIII")
+JOB_STORE_FILE = "jobs.sqlite3"
+JOB_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    archive_path TEXT NOT NULL,
+    archive_hash TEXT NOT NULL,
+    repo_name TEXT NOT NULL,
+    github_username TEXT NOT NULL,
+    is_private INTEGER NOT NULL,
+    options TEXT NOT NULL,
+    state TEXT NOT NULL,
+    stage TEXT,
+    repo_url TEXT,
+    remote_requested INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    owner TEXT,
+    heartbeat REAL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_archive_hash ON jobs (archive_hash);
+CREATE INDEX IF NOT EXISTS jobs_repo_name ON jobs (repo_name);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+CREATE TABLE IF NOT EXISTS archive_cache (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fingerprint TEXT NOT NULL,
+    blake2 TEXT,
+    archive_path TEXT NOT NULL,
+    archive_size INTEGER NOT NULL,
+    archive_mtime INTEGER NOT NULL,
+    options_key TEXT NOT NULL,
+    tree_sha TEXT NOT NULL,
+    commit_sha TEXT NOT NULL,
+    repo_url TEXT NOT NULL,
+    lfs_objects INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS archive_cache_fingerprint ON archive_cache (fingerprint);
+"""
+JOB_STORE_COLUMNS = [("jobs", "owner", "TEXT"), ("jobs", "heartbeat", "REAL")]
+JOB_HEARTBEAT_INTERVAL = 30
+JOB_HEARTBEAT_TIMEOUT = 120
+FINGERPRINT_SAMPLE_SIZE = 64 * 1024
+OBJECT_STORE_DIR = "objects.git"
+DEFAULT_OBJECT_STORE_MAX_MB = 2048
+OBJECT_STORE_GC_LOCK = "gc.lock"
+OBJECT_STORE_LOCK_STALE = 600
+PACK_FILE_SUFFIXES = [".pack", ".rev", ".bitmap", ".idx"]
+SCRATCH_PREFIX = "AutoGitUploader-"
+BASE_REMOTE = "base"
+SCRATCH_TRASH_PREFIX = SCRATCH_PREFIX + "trash-"
+SCRATCH_ORPHAN_AGE = 3 * 24 * 3600
+REAPER_WORKERS = 4
+JOB_JOURNAL_FILE = "job.json"
+JOB_INDEX_FILE = "index.json"
+JOB_ENTRIES_FILE = "entries.json"
+JOB_STAGES = ["indexed", "extracted", "committed", "remote_created", "lfs_uploaded", "pushed"]
+GIT_PROGRESS_PATTERN = re.compile(r"^(?P<phase>[A-Za-z ]+):\s+(?P<percent>\d+)% \((?P<done>\d+)/(?P<total>\d+)\)")
+FAST_IMPORT_STAGES = [("index", 5), ("import", 50), ("remote", 5), ("lfs", 10), ("push", 30)]
+CHECKOUT_STAGES = [("index", 5), ("extract", 40), ("commit", 10), ("remote", 5), ("lfs", 10), ("push", 30)]
+STAGE_LABELS = {
+    "index": "Indexing",
+    "import": "Importing",
+    "extract": "Extracting",
+    "commit": "Committing",
+    "remote": "Creating repository",
+    "lfs": "Uploading LFS objects",
+    "push": "Pushing",
+}
+SEVEN_ZIP_COMMANDS = ["7zz", "7z", "7za"]
+class TransientError(Exception):
+    pass
+def normalize_member_path(name):
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts:
+        return None
+    if ".." in parts:
+        raise ValueError(f"Unsafe path in archive: {name}")
+    if any(part.lower() == ".git" for part in parts):
+        return None
+    return "/".join(parts)
+class ArchiveMember:
+    def __init__(self, path, mode, size, opener, hardlink_to=None):
+        self.path = path
+        self.mode = mode
+        self.size = size
+        self.opener = opener
+        self.hardlink_to = hardlink_to
+    def open(self):
+        return self.opener()
+def iter_zip_members(archive_path, include=None):
+    import zipfile
+    with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+        for info in zip_ref.infolist():
+            if info.is_dir() or (include and not include(info)):
+                continue
+            path = normalize_member_path(info.filename)
+            if path is None:
+                continue
+            yield ArchiveMember(path, zip_info_mode(info), info.file_size, lambda info=info: zip_ref.open(info))
+def iter_tar_stream_members(stream):
+    import tarfile
+    with tarfile.open(fileobj=stream, mode='r|') as tar_ref:
+        for member in tar_ref:
+            if not (member.isfile() or member.issym() or member.islnk()):
+                continue
+            path = normalize_member_path(member.name)
+            if path is None:
+                continue
+            if member.issym():
+                target = member.linkname.encode("utf-8", "surrogateescape")
+                yield ArchiveMember(path, GIT_LINK_MODE, len(target), lambda target=target: io.BytesIO(target))
+            elif member.islnk():
+                yield ArchiveMember(path, tar_member_mode(member), 0, None, normalize_member_path(member.linkname))
+            else:
+                yield ArchiveMember(path, tar_member_mode(member), member.size, lambda member=member: tar_ref.extractfile(member))
+def iter_tar_members(archive_format, archive_path):
+    with archive_format.open_stream(archive_path) as stream:
+        yield from iter_tar_stream_members(stream)
+def find_seven_zip():
+    for command in SEVEN_ZIP_COMMANDS:
+        if shutil.which(command):
+            return command
+    raise ValueError("7z archives need the 7zz, 7z or 7za command to be installed")
+def parse_seven_zip_mode(attributes):
+    for token in attributes.split():
+        if len(token) == 10 and token[0] in "-l":
+            if token[0] == "l":
+                return GIT_LINK_MODE
+            return GIT_EXEC_MODE if "x" in token[3::3] else GIT_FILE_MODE
+    return GIT_FILE_MODE
+def list_seven_zip_entries(archive_path):
+    output = subprocess.run(
+        [find_seven_zip(), "l", "-slt", archive_path],
+        check=True, capture_output=True, text=True, errors="surrogateescape"
+    ).stdout
+    entries = []
+    listing = output.split("----------", 1)[-1]
+    for block in listing.strip().split("\n\n"):
+        fields = dict(line.split(" = ", 1) for line in block.splitlines() if " = " in line)
+        if "Path" not in fields or fields.get("Folder") == "+" or fields.get("Attributes", "").startswith("D"):
+            continue
+        crc = int(fields["CRC"], 16) if fields.get("CRC") else None
+        entries.append((fields["Path"], int(fields.get("Size") or 0), parse_seven_zip_mode(fields.get("Attributes", "")), crc, None))
+    return entries
+class BoundedReader:
+    def __init__(self, stream, size):
+        self.stream = stream
+        self.remaining = size
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.stream.read(size) if size else b""
+        self.remaining -= len(data)
+        return data
+    def drain(self):
+        while self.remaining:
+            if not self.read(COPY_CHUNK_SIZE):
+                raise ValueError("Archive stream ended unexpectedly")
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc_info):
+        return False
+def iter_seven_zip_members(archive_format, archive_path):
+    entries = list_seven_zip_entries(archive_path)
+    with open_decoder_process([find_seven_zip(), "x", "-so", archive_path]) as stream:
+        for name, size, mode, _, _ in entries:
+            reader = BoundedReader(stream, size)
+            path = normalize_member_path(name)
+            if path is not None:
+                yield ArchiveMember(path, mode, size, lambda reader=reader: reader)
+            reader.drain()
+@contextlib.contextmanager
+def open_decoder_process(command):
+    stderr = tempfile.TemporaryFile()
+    process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr)
+    try:
+        yield process.stdout
+        while process.stdout.read(COPY_CHUNK_SIZE):
+            pass
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        process.stdout.close()
+        return_code = process.wait()
+        stderr.seek(0)
+        error_output = stderr.read().decode("utf-8", "replace").strip()
+        stderr.close()
+    if return_code != 0:
+        raise Exception(f"{os.path.basename(command[0])} failed: {error_output or return_code}")
+def tar_member_mode(member):
+    if member.issym():
+        return GIT_LINK_MODE
+    return GIT_EXEC_MODE if member.mode & 0o111 else GIT_FILE_MODE
+def zip_info_mode(info):
+    unix_mode = info.external_attr >> 16
+    if stat.S_ISLNK(unix_mode):
+        return GIT_LINK_MODE
+    return GIT_EXEC_MODE if unix_mode & 0o111 else GIT_FILE_MODE
+def scan_zip_entries(archive_path):
+    import zipfile
+    with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+        for info in zip_ref.infolist():
+            if not info.is_dir():
+                mode = zip_info_mode(info)
+                data = zip_ref.read(info) if is_gitignore_name(info.filename) else None
+                yield info.filename, info.file_size, mode, info.CRC, data
+def scan_tar_entries(archive_format, archive_path):
+    import tarfile
+    if archive_format.name == "tar":
+        with tarfile.open(archive_path, 'r:') as tar_ref:
+            yield from scan_tar_members(tar_ref)
+    else:
+        with archive_format.open_stream(archive_path) as stream:
+            with tarfile.open(fileobj=stream, mode='r|') as tar_ref:
+                yield from scan_tar_members(tar_ref)
+def scan_tar_members(tar_ref):
+    for member in tar_ref:
+        if member.isfile() or member.islnk():
+            data = tar_ref.extractfile(member).read() if member.isfile() and is_gitignore_name(member.name) else None
+            yield member.name, member.size, tar_member_mode(member), None, data
+        elif member.issym():
+            yield member.name, len(member.linkname.encode("utf-8", "surrogateescape")), GIT_LINK_MODE, None, None
+class IndexEntry:
+    __slots__ = ("path", "size", "mode", "crc")
+    def __init__(self, path, size, mode, crc=None):
+        self.path = path
+        self.size = size
+        self.mode = mode
+        self.crc = crc
+class ArchiveIndex:
+    def __init__(self, archive_format, entries, gitignores=None):
+        self.archive_format = archive_format
+        self.entries = entries
+        self.gitignores = gitignores or {}
+        self.excluded_count = 0
+        self.excluded_size = 0
+        self.update_totals()
+    def update_totals(self):
+        self.file_count = len(self.entries)
+        self.total_size = sum(entry.size for entry in self.entries)
+    def apply_excludes(self, rules):
+        kept = [entry for entry in self.entries if not rules.excluded(entry.path)]
+        self.excluded_count = len(self.entries) - len(kept)
+        self.excluded_size = self.total_size - sum(entry.size for entry in kept)
+        self.entries = kept
+        self.update_totals()
+    def oversized_entries(self, limit):
+        return [entry for entry in self.entries if entry.size > limit]
+    def save(self, path):
+        data = {
+            "format": self.archive_format.name,
+            "entries": [[entry.path, entry.size, entry.mode, entry.crc] for entry in self.entries],
+            "gitignores": self.gitignores
+        }
+        write_json_atomic(path, data)
+    @classmethod
+    def load(cls, path):
+        with open(path) as index_file:
+            data = json.load(index_file)
+        archive_format = next(archive_format for archive_format in ARCHIVE_FORMATS if archive_format.name == data["format"])
+        return cls(archive_format, [IndexEntry(*entry) for entry in data["entries"]], data["gitignores"])
+def write_json_atomic(path, data):
+    with open(path + ".tmp", "w") as json_file:
+        json.dump(data, json_file)
+    os.replace(path + ".tmp", path)
+class JobJournal:
+    def __init__(self, path):
+        self.path = path
+        self.data = {"stages": []}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as journal_file:
+                self.data = json.load(journal_file)
+    def done(self, stage):
+        return stage in self.data["stages"]
+    def mark(self, stage, **values):
+        with self.lock:
+            self.data.update(values)
+            if stage not in self.data["stages"]:
+                self.data["stages"].append(stage)
+            write_json_atomic(self.path, self.data)
+    def note(self, **values):
+        with self.lock:
+            self.data.update(values)
+            write_json_atomic(self.path, self.data)
+    def next_stage(self):
+        return next((stage for stage in JOB_STAGES if not self.done(stage)), None)
+def job_scratch_roots(scratch_dir):
+    roots = [RAM_SCRATCH_DIR, scratch_dir, tempfile.gettempdir()]
+    return [root for index, root in enumerate(roots) if root and os.path.isdir(root) and root not in roots[:index]]
+def remove_file(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        os.chmod(path, stat.S_IWRITE)
+        os.unlink(path)
+def remove_files(paths):
+    for path in paths:
+        remove_file(path)
+def remove_tree(path):
+    from concurrent.futures import ThreadPoolExecutor
+    directories = [path]
+    files = []
+    for directory in directories:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                else:
+                    files.append(entry.path)
+    with ThreadPoolExecutor(max_workers=REAPER_WORKERS) as executor:
+        list(executor.map(remove_files, [files[index::REAPER_WORKERS] for index in range(REAPER_WORKERS)]))
+    for directory in reversed(directories):
+        os.rmdir(directory)
+class ScratchReaper:
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+    def discard(self, path):
+        trash = os.path.join(os.path.dirname(path), f"{SCRATCH_TRASH_PREFIX}{os.urandom(8).hex()}")
+        try:
+            os.rename(path, trash)
+        except OSError:
+            trash = path
+        self.queue.put(trash)
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+    def sweep(self, scratch_roots, max_age=SCRATCH_ORPHAN_AGE):
+        swept = 0
+        for root in scratch_roots:
+            for name in os.listdir(root):
+                path = os.path.join(root, name)
+                if not name.startswith(SCRATCH_PREFIX) or not os.path.isdir(path):
+                    continue
+                try:
+                    last_used = max(os.path.getmtime(candidate) for candidate in [path, os.path.join(path, JOB_JOURNAL_FILE)] if os.path.exists(candidate))
+                except OSError:
+                    continue
+                if name.startswith(SCRATCH_TRASH_PREFIX) or time.time() - last_used > max_age:
+                    self.discard(path)
+                    swept += 1
+        return swept
+    def run(self):
+        while True:
+            path = self.queue.get()
+            try:
+                remove_tree(path)
+            except OSError:
+                shutil.rmtree(path, ignore_errors=True)
+            finally:
+                self.queue.task_done()
+    def wait(self):
+        self.queue.join()
+SCRATCH_REAPER = ScratchReaper()
+def find_job_dir(job_id, scratch_roots):
+    for root in scratch_roots:
+        job_dir = os.path.join(root, f"{SCRATCH_PREFIX}job-{job_id}")
+        if os.path.exists(os.path.join(job_dir, JOB_JOURNAL_FILE)):
+            return job_dir
+    return None
+class JobLock:
+    def __init__(self, job_id):
+        self.path = os.path.join(tempfile.gettempdir(), f"{SCRATCH_PREFIX}job-{job_id}.lock")
+        self.fd = None
+    def acquire(self):
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if sys.platform == "win32":
+                    import msvcrt
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                else:
+                    import fcntl
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+            try:
+                if os.stat(self.path).st_ino == os.fstat(fd).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+        os.truncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self.fd = fd
+        return True
+    def release(self):
+        if self.fd is None:
+            return
+        if sys.platform != "win32":
+            remove_file(self.path)
+        os.close(self.fd)
+        self.fd = None
+        if sys.platform == "win32":
+            with contextlib.suppress(OSError):
+                os.unlink(self.path)
+def is_gitignore_name(name):
+    return name.replace("\\", "/").rsplit("/", 1)[-1] == ".gitignore"
+def read_seven_zip_member(archive_path, name):
+    return subprocess.run([find_seven_zip(), "x", "-so", archive_path, name], check=True, capture_output=True).stdout
+def build_archive_index(archive_path):
+    archive_format = detect_archive_format(archive_path)
+    entries = []
+    gitignores = {}
+    for name, size, mode, crc, data in archive_format.scan(archive_path):
+        path = normalize_member_path(name)
+        if path is None:
+            continue
+        entries.append(IndexEntry(path, size, mode, crc))
+        if is_gitignore_name(path) and mode != GIT_LINK_MODE:
+            if data is None and archive_format.container == "7z":
+                data = read_seven_zip_member(archive_path, name)
+            if data is not None:
+                gitignores[path[:-len(".gitignore")]] = data.decode("utf-8", "replace")
+    return ArchiveIndex(archive_format, entries, gitignores)
+def translate_gitignore_glob(pattern):
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and pattern.find("]", i + 2) != -1:
+            end = pattern.find("]", i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(parts)
+class ExcludeRule:
+    __slots__ = ("regex", "negate", "directory_only")
+    def __init__(self, regex, negate, directory_only):
+        self.regex = regex
+        self.negate = negate
+        self.directory_only = directory_only
+class ExcludeRules:
+    def __init__(self):
+        self.rules = []
+        self.directory_cache = {}
+    def add_patterns(self, lines, base=""):
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if not line.endswith("\\ "):
+                line = line.rstrip(" ")
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            if line.startswith("\\"):
+                line = line[1:]
+            directory_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            regex = translate_gitignore_glob(line.lstrip("/"))
+            if not anchored:
+                regex = "(?:.*/)?" + regex
+            self.rules.append(ExcludeRule(re.compile(re.escape(base) + regex + "$"), negate, directory_only))
+        self.directory_cache.clear()
+    def matches(self, path, is_directory):
+        result = False
+        for rule in self.rules:
+            if (is_directory or not rule.directory_only) and rule.regex.match(path):
+                result = not rule.negate
+        return result
+    def directory_excluded(self, path):
+        if path not in self.directory_cache:
+            parent = path.rpartition("/")[0]
+            self.directory_cache[path] = (bool(parent) and self.directory_excluded(parent)) or self.matches(path, True)
+        return self.directory_cache[path]
+    def excluded(self, path):
+        parent = path.rpartition("/")[0]
+        if parent and self.directory_excluded(parent):
+            return True
+        return self.matches(path, False)
+def build_exclude_rules(patterns, gitignores):
+    rules = ExcludeRules()
+    rules.add_patterns(patterns)
+    for base in sorted(gitignores, key=lambda base: base.count("/")):
+        rules.add_patterns(gitignores[base].splitlines(), base)
+    return rules
+class ArchiveFormat:
+    def __init__(self, name, extensions, signatures, container, decoder_commands=(), decoder_fallback=None):
+        self.name = name
+        self.extensions = extensions
+        self.signatures = signatures
+        self.container = container
+        self.decoder_commands = decoder_commands
+        self.decoder_fallback = decoder_fallback
+    def matches(self, header):
+        return any(header[offset:offset + len(magic)] == magic for offset, magic in self.signatures)
+    def strip_extension(self, file_name):
+        lower_name = file_name.lower()
+        for extension in sorted(self.extensions, key=len, reverse=True):
+            if lower_name.endswith(extension):
+                return file_name[:-len(extension)]
+        return None
+    def open_stream(self, archive_path):
+        for command in self.decoder_commands:
+            if shutil.which(command[0]):
+                return open_decoder_process(list(command) + [archive_path])
+        if self.decoder_fallback:
+            return self.decoder_fallback(archive_path)
+        return open(archive_path, 'rb')
+    def iter_members(self, archive_path):
+        if self.container == "zip":
+            return iter_zip_members(archive_path)
+        if self.container == "7z":
+            return iter_seven_zip_members(self, archive_path)
+        return iter_tar_members(self, archive_path)
+    def scan(self, archive_path):
+        if self.container == "zip":
+            return scan_zip_entries(archive_path)
+        if self.container == "7z":
+            return list_seven_zip_entries(archive_path)
+        return scan_tar_entries(self, archive_path)
+def open_gzip_module_stream(archive_path):
+    import gzip
+    return gzip.open(archive_path, 'rb')
+def open_bz2_module_stream(archive_path):
+    import bz2
+    return bz2.open(archive_path, 'rb')
+def open_lzma_module_stream(archive_path):
+    import lzma
+    return lzma.open(archive_path, 'rb')
+def open_zstd_module_stream(archive_path):
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd archives need the zstd command or the zstandard package to be installed")
+    return zstandard.ZstdDecompressor().stream_reader(open(archive_path, 'rb'), read_size=COPY_CHUNK_SIZE, closefd=True)
+ARCHIVE_FORMATS = []
+def register_archive_format(archive_format):
+    ARCHIVE_FORMATS.append(archive_format)
+    return archive_format
+def detect_archive_format(archive_path):
+    with open(archive_path, 'rb') as archive_file:
+        header = archive_file.read(SNIFF_SIZE)
+    for archive_format in ARCHIVE_FORMATS:
+        if archive_format.matches(header):
+            return archive_format
+    file_name = os.path.basename(archive_path)
+    for archive_format in ARCHIVE_FORMATS:
+        if archive_format.strip_extension(file_name) is not None:
+            return archive_format
+    raise ValueError(f"Unsupported archive format: {file_name}")
+def archive_base_name(file_name):
+    for archive_format in sorted(ARCHIVE_FORMATS, key=lambda archive_format: max(map(len, archive_format.extensions)), reverse=True):
+        base_name = archive_format.strip_extension(file_name)
+        if base_name:
+            return base_name
+    return os.path.splitext(file_name)[0]
+def is_archive_name(file_name):
+    return any(archive_format.strip_extension(file_name) for archive_format in ARCHIVE_FORMATS)
+register_archive_format(ArchiveFormat("zip", [".zip"], [(0, b"PK\x03\x04"), (0, b"PK\x05\x06")], "zip"))
+register_archive_format(ArchiveFormat("7z", [".7z"], [(0, b"7z\xbc\xaf\x27\x1c")], "7z"))
+register_archive_format(ArchiveFormat("gzip", [".tar.gz", ".tgz", ".gz"], [(0, b"\x1f\x8b")], "tar", [("pigz", "-dc"), ("gzip", "-dc")], open_gzip_module_stream))
+register_archive_format(ArchiveFormat("bzip2", [".tar.bz2", ".tbz2", ".tbz", ".bz2"], [(0, b"BZh")], "tar", [("lbzip2", "-dc"), ("pbzip2", "-dc")], open_bz2_module_stream))
+register_archive_format(ArchiveFormat("xz", [".tar.xz", ".txz", ".xz"], [(0, b"\xfd7zXZ\x00")], "tar", [("xz", "-T0", "-dc")], open_lzma_module_stream))
+register_archive_format(ArchiveFormat("zstd", [".tar.zst", ".tzst", ".zst"], [(0, b"\x28\xb5\x2f\xfd")], "tar", [("zstd", "-dc")], open_zstd_module_stream))
+register_archive_format(ArchiveFormat("tar", [".tar"], [(257, b"ustar")], "tar"))
+def iter_archive_members(archive_path):
+    return detect_archive_format(archive_path).iter_members(archive_path)
+def choose_scratch_dir(uncompressed_size, ram_budget, fallback_dir=None):
+    if uncompressed_size is not None and uncompressed_size <= ram_budget and os.path.isdir(RAM_SCRATCH_DIR):
+        if shutil.disk_usage(RAM_SCRATCH_DIR).free >= uncompressed_size * RAM_SCRATCH_HEADROOM:
+            return RAM_SCRATCH_DIR
+    if fallback_dir:
+        os.makedirs(fallback_dir, exist_ok=True)
+        return fallback_dir
+    return None
+def split_zip_work_units(infos, unit_count):
+    units = [(0, index, []) for index in range(unit_count)]
+    heapq.heapify(units)
+    for info in sorted(infos, key=lambda info: info.compress_size, reverse=True):
+        unit_size, index, names = heapq.heappop(units)
+        names.append(info.filename)
+        heapq.heappush(units, (unit_size + info.compress_size, index, names))
+    return [names for _, _, names in sorted(units, key=lambda unit: unit[0], reverse=True) if names]
+class LooseObjectWriter:
+    def __init__(self, objects_dir, size, object_type="blob"):
+        self.objects_dir = objects_dir
+        header = f"{object_type} {size}\0".encode()
+        self.digest = hashlib.sha1(header)
+        self.compressor = zlib.compressobj(LOOSE_OBJECT_COMPRESSION)
+        self.temp_file = tempfile.NamedTemporaryFile(dir=objects_dir, prefix="tmp_obj_", delete=False)
+        self.temp_file.write(self.compressor.compress(header))
+    def write(self, chunk):
+        self.digest.update(chunk)
+        self.temp_file.write(self.compressor.compress(chunk))
+    def finish(self):
+        self.temp_file.write(self.compressor.flush())
+        self.temp_file.close()
+        sha = self.digest.hexdigest()
+        object_path = os.path.join(self.objects_dir, sha[:2], sha[2:])
+        if os.path.exists(object_path):
+            os.remove(self.temp_file.name)
+        else:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            os.chmod(self.temp_file.name, 0o444)
+            os.replace(self.temp_file.name, object_path)
+        return sha
+    def abort(self):
+        self.temp_file.close()
+        if os.path.exists(self.temp_file.name):
+            os.remove(self.temp_file.name)
+class LooseObjectStore:
+    def __init__(self, objects_dir):
+        self.objects_dir = objects_dir
+    def open_object(self, size, object_type="blob"):
+        return LooseObjectWriter(self.objects_dir, size, object_type)
+    def finish(self):
+        return None
+    def abort(self):
+        pass
+def encode_pack_object_header(object_type, size):
+    byte = (PACK_OBJECT_TYPES[object_type] << 4) | (size & 0x0f)
+    size >>= 4
+    header = bytearray()
+    while size:
+        header.append(byte | 0x80)
+        byte = size & 0x7f
+        size >>= 7
+    header.append(byte)
+    return bytes(header)
+class PackObjectWriter:
+    def __init__(self, pack, size, object_type):
+        self.pack = pack
+        header = f"{object_type} {size}\0".encode()
+        self.digest = hashlib.sha1(header)
+        self.compressor = zlib.compressobj(PACK_COMPRESSION)
+        self.offset = pack.offset
+        self.crc = 0
+        self.emit(encode_pack_object_header(object_type, size))
+    def emit(self, data):
+        self.pack.pack_file.write(data)
+        self.pack.offset += len(data)
+        self.crc = zlib.crc32(data, self.crc)
+    def write(self, chunk):
+        self.digest.update(chunk)
+        compressed = self.compressor.compress(chunk)
+        if compressed:
+            self.emit(compressed)
+    def finish(self):
+        self.emit(self.compressor.flush())
+        sha = self.digest.digest()
+        if sha in self.pack.written:
+            self.pack.pack_file.seek(self.offset)
+            self.pack.pack_file.truncate()
+            self.pack.offset = self.offset
+        else:
+            self.pack.written.add(sha)
+            self.pack.objects.append((sha, self.crc, self.offset))
+        return sha.hex()
+    def abort(self):
+        self.pack.broken = True
+class PackWriter:
+    def __init__(self, objects_dir):
+        self.objects_dir = objects_dir
+        self.pack_dir = os.path.join(objects_dir, "pack")
+        os.makedirs(self.pack_dir, exist_ok=True)
+        self.pack_file = tempfile.NamedTemporaryFile(dir=self.pack_dir, prefix="tmp_pack_", delete=False)
+        self.pack_file.write(b"PACK" + struct.pack(">II", 2, 0))
+        self.offset = 12
+        self.objects = []
+        self.written = set()
+        self.broken = False
+    def open_object(self, size, object_type="blob"):
+        if self.broken:
+            raise ValueError("Pack file is incomplete after a failed write")
+        return PackObjectWriter(self, size, object_type)
+    def finish(self):
+        if not self.objects:
+            self.abort()
+            return None
+        self.pack_file.seek(8)
+        self.pack_file.write(struct.pack(">I", len(self.objects)))
+        self.pack_file.seek(0)
+        digest = hashlib.sha1()
+        while True:
+            chunk = self.pack_file.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+        checksum = digest.digest()
+        self.pack_file.write(checksum)
+        self.pack_file.close()
+        pack_base = os.path.join(self.pack_dir, f"pack-{checksum.hex()}")
+        with open(pack_base + ".idx.tmp", 'wb') as index_file:
+            index_file.write(self.build_index(checksum))
+        os.chmod(self.pack_file.name, 0o444)
+        os.replace(self.pack_file.name, pack_base + ".pack")
+        os.replace(pack_base + ".idx.tmp", pack_base + ".idx")
+        return pack_base + ".pack"
+    def build_index(self, checksum):
+        objects = sorted(self.objects)
+        fanout = [0] * 256
+        for sha, _, _ in objects:
+            fanout[sha[0]] += 1
+        for index in range(1, 256):
+            fanout[index] += fanout[index - 1]
+        offsets = []
+        large_offsets = []
+        for _, _, offset in objects:
+            if offset < PACK_LARGE_OFFSET:
+                offsets.append(struct.pack(">I", offset))
+            else:
+                offsets.append(struct.pack(">I", PACK_LARGE_OFFSET | len(large_offsets)))
+                large_offsets.append(struct.pack(">Q", offset))
+        data = b"".join([
+            b"\377tOc", struct.pack(">I", 2), struct.pack(">256I", *fanout),
+            b"".join(sha for sha, _, _ in objects),
+            b"".join(struct.pack(">I", crc & 0xffffffff) for _, crc, _ in objects),
+            b"".join(offsets), b"".join(large_offsets), checksum
+        ])
+        return data + hashlib.sha1(data).digest()
+    def abort(self):
+        self.pack_file.close()
+        if os.path.exists(self.pack_file.name):
+            os.remove(self.pack_file.name)
+def open_object_store(objects_dir, object_format):
+    if object_format == "pack":
+        return PackWriter(objects_dir)
+    return LooseObjectStore(objects_dir)
+def write_object(store, data, object_type="blob"):
+    writer = store.open_object(len(data), object_type)
+    writer.write(data)
+    return writer.finish()
+def write_tree_objects(store, entries):
+    root = {}
+    for path, entry in entries.items():
+        parts = path.split("/")
+        node = root
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+            if not isinstance(node, dict):
+                raise ValueError(f"Archive contains both a file and a directory named {part}")
+        if isinstance(node.get(parts[-1]), dict):
+            raise ValueError(f"Archive contains both a file and a directory named {path}")
+        node[parts[-1]] = entry
+    return write_tree_node(store, root)
+def write_tree_node(store, node):
+    items = []
+    for name, value in node.items():
+        encoded_name = name.encode("utf-8", "surrogateescape")
+        if isinstance(value, dict):
+            items.append((encoded_name + b"/", b"40000", encoded_name, write_tree_node(store, value)))
+        else:
+            items.append((encoded_name, value[0].encode(), encoded_name, value[1]))
+    items.sort(key=lambda item: item[0])
+    data = b"".join(mode + b" " + name + b"\0" + bytes.fromhex(sha) for _, mode, name, sha in items)
+    return write_object(store, data, "tree")
+def write_commit_object(store, tree_sha, ident, message, parent=None):
+    lines = [f"tree {tree_sha}"]
+    if parent:
+        lines.append(f"parent {parent}")
+    lines += [f"author {ident}", f"committer {ident}", "", message]
+    return write_object(store, ("\n".join(lines) + "\n").encode("utf-8"), "commit")
+def worktree_target(worktree, path, checked_dirs):
+    target = os.path.join(worktree, *path.split("/"))
+    parent = os.path.dirname(target)
+    if parent not in checked_dirs:
+        os.makedirs(parent, exist_ok=True)
+        real_parent = os.path.realpath(parent)
+        if real_parent != os.path.realpath(worktree) and not real_parent.startswith(os.path.realpath(worktree) + os.sep):
+            raise ValueError(f"Unsafe path in archive: {path}")
+        checked_dirs.add(parent)
+    if os.path.lexists(target) and not os.path.isdir(target):
+        os.remove(target)
+    return target
+def write_worktree_blob(source, size, mode, target, store, on_bytes=None):
+    writer = store.open_object(size)
+    try:
+        if mode == GIT_LINK_MODE:
+            link_target = source.read(size)
+            writer.write(link_target)
+            os.symlink(os.fsdecode(link_target), target)
+        else:
+            remaining = size
+            with open(target, 'wb') as output:
+                while remaining:
+                    chunk = source.read(min(COPY_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise ValueError(f"Archive member is truncated: {target}")
+                    output.write(chunk)
+                    writer.write(chunk)
+                    remaining -= len(chunk)
+                    if on_bytes:
+                        on_bytes(len(chunk))
+            if mode == GIT_EXEC_MODE:
+                os.chmod(target, 0o755)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.finish()
+def extract_zip_work_unit(archive_path, names, extract_to, objects_dir, object_format):
+    import zipfile
+    entries = []
+    checked_dirs = set()
+    store = open_object_store(objects_dir, object_format)
+    try:
+        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+            for name in names:
+                info = zip_ref.getinfo(name)
+                path = normalize_member_path(name)
+                mode = zip_info_mode(info)
+                with zip_ref.open(info) as source:
+                    sha = write_worktree_blob(source, info.file_size, mode, worktree_target(extract_to, path, checked_dirs), store)
+                entries.append((path, mode, sha, info.file_size))
+    except BaseException:
+        store.abort()
+        raise
+    store.finish()
+    return entries
+class QueueReader:
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.buffer = b""
+        self.finished = False
+    def read(self, size=-1):
+        while not self.finished and (size < 0 or len(self.buffer) < size):
+            chunk = self.pipeline.get()
+            if chunk is None:
+                self.finished = True
+            else:
+                self.buffer += chunk
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+    def drain(self):
+        while not self.finished:
+            self.read(COPY_CHUNK_SIZE)
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc_info):
+        return False
+class MemberPipeline:
+    def __init__(self, members, wanted, depth=PIPELINE_DEPTH):
+        self.queue = queue.Queue(maxsize=depth)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.produce, args=(members, wanted), daemon=True)
+        self.thread.start()
+    def put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise InterruptedError("Extraction pipeline was stopped")
+    def produce(self, members, wanted):
+        try:
+            for member in members:
+                if not wanted(member):
+                    continue
+                self.put(("member", member))
+                if member.hardlink_to is None:
+                    with member.open() as source:
+                        while True:
+                            chunk = source.read(COPY_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            self.put(("chunk", chunk))
+                self.put(("chunk", None))
+            self.put(("done", None))
+        except InterruptedError:
+            pass
+        except BaseException as e:
+            try:
+                self.put(("error", e))
+            except InterruptedError:
+                pass
+    def get(self):
+        kind, value = self.queue.get()
+        if kind == "error":
+            raise value
+        return value
+    def __iter__(self):
+        while True:
+            kind, value = self.queue.get()
+            if kind == "error":
+                raise value
+            if kind == "done":
+                return
+            reader = QueueReader(self)
+            yield value, reader
+            reader.drain()
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+def plan_commit_chunks(paths, sizes, budget):
+    chunks = [([], 0)]
+    for path in sorted(paths):
+        size = sizes.get(path, 0)
+        chunk_paths, chunk_size = chunks[-1]
+        if budget > 0 and chunk_paths and chunk_size + size > budget:
+            chunks.append(([], 0))
+            chunk_paths, chunk_size = chunks[-1]
+        chunk_paths.append(path)
+        chunks[-1] = (chunk_paths, chunk_size + size)
+    return chunks
+def chunk_commit_message(number, count):
+    if count == 1:
+        return "Initial commit"
+    return f"Initial commit (part {number}/{count})"
+def fetch_base_commit(git_dir, url):
+    result = subprocess.run(["git", "ls-remote", "--symref", url, "HEAD"], cwd=git_dir, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Exception(f"Reading the existing repository failed: {result.stderr.strip()}")
+    head_ref = next((line.split()[1] for line in result.stdout.splitlines() if line.startswith("ref: ")), None)
+    if head_ref is None:
+        return None, None
+    for args in [["remote", "add", BASE_REMOTE, url], ["config", f"remote.{BASE_REMOTE}.promisor", "true"], ["config", f"remote.{BASE_REMOTE}.partialclonefilter", "blob:none"]]:
+        subprocess.run(["git", *args], cwd=git_dir, capture_output=True, check=True)
+    result = subprocess.run(["git", "fetch", "--depth=1", "--filter=blob:none", "--no-tags", BASE_REMOTE, head_ref], cwd=git_dir, capture_output=True, text=True)
+    if result.returncode != 0:
+        if "couldn't find remote ref" in result.stderr:
+            return None, head_ref
+        raise Exception(f"Fetching the existing repository failed: {result.stderr.strip()}")
+    return subprocess.run(["git", "rev-parse", "FETCH_HEAD"], cwd=git_dir, capture_output=True, text=True, check=True).stdout.strip(), head_ref
+def update_git_index(worktree, entries):
+    records = b"".join(f"{mode} {sha}\t{path}\0".encode("utf-8", "surrogateescape") for path, (mode, sha) in sorted(entries.items()))
+    subprocess.run(["git", "update-index", "-z", "--index-info"], cwd=worktree, input=records, check=True, capture_output=True)
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+class ProgressTracker:
+    def __init__(self, stages, on_progress, on_stats, interval=PROGRESS_INTERVAL):
+        self.weights = dict(stages)
+        self.total_weight = sum(self.weights.values())
+        self.on_progress = on_progress
+        self.on_stats = on_stats
+        self.interval = interval
+        self.completed_weight = 0
+        self.stage = None
+        self.stage_total = 0
+        self.stage_done = 0
+        self.stage_started = 0
+        self.last_report = 0
+        self.watched = []
+    def abort_on_failure(self, future):
+        self.watched.append(future)
+    def check_watched(self):
+        for future in self.watched:
+            if future.done() and future.exception():
+                raise future.exception()
+    def start(self, stage, total_bytes=0):
+        self.stage = stage
+        self.stage_total = max(total_bytes, 0)
+        self.stage_done = 0
+        self.stage_started = time.monotonic()
+        self.report(force=True)
+    def advance(self, amount):
+        self.stage_done += amount
+        self.report()
+        self.check_watched()
+    def update(self, done):
+        self.stage_done = done
+        self.report()
+        self.check_watched()
+    def finish(self):
+        self.completed_weight += self.weights.get(self.stage, 0)
+        self.stage = None
+        self.report(force=True)
+    def percent(self):
+        weight = self.weights.get(self.stage, 0) if self.stage else 0
+        fraction = min(self.stage_done / self.stage_total, 1.0) if self.stage_total else 0.0
+        return int(100 * (self.completed_weight + weight * fraction) / self.total_weight)
+    def report(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.last_report < self.interval:
+            return
+        self.last_report = now
+        self.on_progress(self.percent())
+        if self.stage is None:
+            return
+        label = STAGE_LABELS.get(self.stage, self.stage)
+        if not self.stage_total:
+            self.on_stats(f"{label}...")
+            return
+        elapsed = max(now - self.stage_started, 1e-6)
+        rate = self.stage_done / elapsed
+        done_mb = self.stage_done / (1024 * 1024)
+        total_mb = self.stage_total / (1024 * 1024)
+        eta = format_duration((self.stage_total - self.stage_done) / rate) if rate > 0 else "unknown"
+        self.on_stats(f"{label}: {done_mb:.1f} / {total_mb:.1f} MB, {rate / (1024 * 1024):.1f} MB/s, ETA {eta}")
+def run_git_with_progress(args, cwd, on_fraction):
+    process = subprocess.Popen(["git"] + args + ["--progress"], cwd=cwd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    output = []
+    buffer = b""
+    while True:
+        chunk = process.stderr.read1(4096)
+        if not chunk:
+            break
+        buffer += chunk
+        lines = re.split(rb"[\r\n]", buffer)
+        buffer = lines.pop()
+        for line in lines:
+            text = line.decode("utf-8", "replace").strip()
+            match = GIT_PROGRESS_PATTERN.match(text.removeprefix("remote: "))
+            if match:
+                if match.group("phase") == "Writing objects" and int(match.group("total")):
+                    on_fraction(int(match.group("done")) / int(match.group("total")))
+            elif text:
+                output.append(text)
+    return_code = process.wait()
+    if return_code != 0:
+        raise Exception(f"git {args[0]} failed: {' '.join(output[-5:]) or return_code}")
+def repo_object_bytes(git_dir):
+    output = subprocess.run(["git", "count-objects", "-v"], cwd=git_dir, check=True, capture_output=True, text=True).stdout
+    counts = dict(line.split(": ", 1) for line in output.splitlines() if ": " in line)
+    return (int(counts.get("size", 0)) + int(counts.get("size-pack", 0))) * 1024
+def lfs_pointer(oid, size):
+    return f"version https://git-lfs.github.com/spec/v1\noid sha256:{oid}\nsize {size}\n".encode()
+def lfs_attributes_line(path):
+    pattern = "/" + re.sub(r"([\\*?\[\]!#])", r"\\\1", path).replace(" ", "[[:space:]]")
+    return f"{pattern} {LFS_ATTRIBUTES}\n"
+def store_lfs_object(lfs_dir, source, size, on_bytes=None):
+    temp_dir = os.path.join(lfs_dir, "tmp")
+    os.makedirs(temp_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    remaining = size
+    with tempfile.NamedTemporaryFile(dir=temp_dir, delete=False) as spool:
+        try:
+            while remaining:
+                chunk = source.read(min(COPY_CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise ValueError("Archive member is truncated")
+                digest.update(chunk)
+                spool.write(chunk)
+                remaining -= len(chunk)
+                if on_bytes:
+                    on_bytes(len(chunk))
+        except BaseException:
+            spool.close()
+            os.remove(spool.name)
+            raise
+    oid = digest.hexdigest()
+    object_path = os.path.join(lfs_dir, "objects", oid[0:2], oid[2:4], oid)
+    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+    os.replace(spool.name, object_path)
+    return oid, object_path
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+def api_error_message(response):
+    try:
+        return response.json().get("message", response.text)
+    except ValueError:
+        return response.text or str(response.status_code)
+class ApiClient:
+    def __init__(self, connect_timeout=DEFAULT_API_CONNECT_TIMEOUT, read_timeout=DEFAULT_API_READ_TIMEOUT, pool_size=API_POOL_SIZE):
+        import requests
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = "AutoGitUploader"
+        self.request_bucket = TokenBucket(API_REQUEST_RATE, API_REQUEST_BURST)
+        self.create_bucket = TokenBucket(API_CREATE_RATE, API_CREATE_BURST)
+        self.rate_remaining = None
+        self.rate_reset = 0
+        self.rate_lock = threading.Lock()
+    def request(self, method, url, **kwargs):
+        import requests
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.Timeout:
+            raise TransientError(f"{method} {url} timed out (connect {self.timeout[0]}s, read {self.timeout[1]}s)")
+        except requests.ConnectionError as e:
+            raise TransientError(f"{method} {url} failed: {e}")
+    def github(self, method, path, token, on_wait=None, **kwargs):
+        headers = {
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json"
+        }
+        headers.update(kwargs.pop("headers", {}))
+        for attempt in range(API_RETRY_ATTEMPTS):
+            self.wait_for_reset(on_wait)
+            self.request_bucket.acquire()
+            if method != "GET":
+                self.create_bucket.acquire()
+            response = self.request(method, f"{GITHUB_API_URL}{path}", headers=headers, **kwargs)
+            self.record_limits(response)
+            delay = self.retry_delay(response, attempt)
+            if delay is None:
+                return response
+            if attempt + 1 < API_RETRY_ATTEMPTS:
+                if on_wait:
+                    on_wait(f"GitHub API rate limit hit, retrying in {delay:.0f}s")
+                time.sleep(delay)
+        raise TransientError(f"GitHub API rate limit still exceeded after {API_RETRY_ATTEMPTS} attempts: {response.text or response.status_code}")
+    def record_limits(self, response):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        with self.rate_lock:
+            self.rate_remaining = int(remaining)
+            self.rate_reset = int(reset)
+    def wait_for_reset(self, on_wait=None):
+        with self.rate_lock:
+            if self.rate_remaining != 0:
+                return
+            delay = self.rate_reset - time.time() + 1
+            self.rate_remaining = None
+        if delay > 0:
+            if on_wait:
+                on_wait(f"GitHub API quota exhausted, waiting {delay:.0f}s for it to reset")
+            time.sleep(min(delay, API_BACKOFF_MAX) + random.uniform(0, 1))
+    def retry_delay(self, response, attempt):
+        if response.status_code not in [403, 429]:
+            return None
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return int(retry_after) + random.uniform(0, 1)
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            return min(max(int(response.headers.get("X-RateLimit-Reset", 0)) - time.time(), 0) + 1, API_BACKOFF_MAX) + random.uniform(0, 1)
+        if response.status_code == 403 and "rate limit" not in response.text.lower():
+            return None
+        return random.uniform(0, min(API_BACKOFF_MAX, API_BACKOFF_BASE * 2 ** (attempt + 1)))
+API_CLIENT = None
+API_CLIENT_LOCK = threading.Lock()
+def get_api_client():
+    global API_CLIENT
+    with API_CLIENT_LOCK:
+        if API_CLIENT is None:
+            API_CLIENT = ApiClient()
+        return API_CLIENT
+def configure_api_client(connect_timeout, read_timeout):
+    get_api_client().timeout = (connect_timeout, read_timeout)
+class LfsClient:
+    def __init__(self, lfs_url, username, token, workers=DEFAULT_LFS_WORKERS):
+        self.api = get_api_client()
+        self.lfs_url = lfs_url.rstrip("/")
+        self.auth = (username, token)
+        self.workers = workers
+        self.headers = {"Accept": LFS_MEDIA_TYPE, "Content-Type": LFS_MEDIA_TYPE}
+    def batch(self, objects):
+        data = {"operation": "upload", "transfers": ["basic"], "objects": objects}
+        response = self.api.request("POST", f"{self.lfs_url}/objects/batch", auth=self.auth, headers=self.headers, data=json.dumps(data))
+        if response.status_code != 200:
+            raise (TransientError if response.status_code >= 500 else Exception)(f"LFS batch request failed: {response.text or response.status_code}")
+        return response.json().get("objects", [])
+    def upload(self, objects, on_bytes=None):
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        pending = []
+        items = list(objects.items())
+        for start in range(0, len(items), LFS_BATCH_SIZE):
+            for result in self.batch([{"oid": oid, "size": size} for oid, (size, _) in items[start:start + LFS_BATCH_SIZE]]):
+                if "error" in result:
+                    raise Exception(f"LFS rejected object {result['oid']}: {result['error'].get('message')}")
+                actions = result.get("actions") or {}
+                if "upload" in actions:
+                    pending.append((result["oid"], actions))
+                elif on_bytes:
+                    on_bytes(result.get("size", 0))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.upload_object, oid, objects[oid], actions) for oid, actions in pending]
+            for future in as_completed(futures):
+                uploaded = future.result()
+                if on_bytes:
+                    on_bytes(uploaded)
+        return len(pending)
+    def upload_object(self, oid, lfs_object, actions):
+        size, object_path = lfs_object
+        upload = actions["upload"]
+        headers = {"Content-Type": "application/octet-stream"}
+        headers.update(upload.get("header", {}))
+        with open(object_path, 'rb') as object_file:
+            response = self.api.request("PUT", upload["href"], headers=headers, data=object_file)
+        if response.status_code not in [200, 201]:
+            raise (TransientError if response.status_code >= 500 else Exception)(f"LFS upload of {oid} failed: {response.text or response.status_code}")
+        verify = actions.get("verify")
+        if verify:
+            headers = dict(self.headers)
+            headers.update(verify.get("header", {}))
+            response = self.api.request("POST", verify["href"], auth=self.auth, headers=headers, data=json.dumps({"oid": oid, "size": size}))
+            if response.status_code != 200:
+                raise (TransientError if response.status_code >= 500 else Exception)(f"LFS verification of {oid} failed: {response.text or response.status_code}")
+        return size
+class StageLimits:
+    def __init__(self, cpu_slots=DEFAULT_CPU_STAGE_SLOTS, network_slots=DEFAULT_NETWORK_STAGE_SLOTS):
+        self.cpu = threading.BoundedSemaphore(max(cpu_slots, 1))
+        self.network = threading.BoundedSemaphore(max(network_slots, 1))
+def user_data_dir():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "AutoGitUploader")
+def default_job_store_path():
+    return os.path.join(user_data_dir(), JOB_STORE_FILE)
+def default_object_store_path():
+    return os.path.join(user_data_dir(), OBJECT_STORE_DIR)
+def archive_fingerprint(archive_path):
+    size = os.path.getsize(archive_path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(archive_path, 'rb') as archive_file:
+        digest.update(archive_file.read(FINGERPRINT_SAMPLE_SIZE))
+        if size > FINGERPRINT_SAMPLE_SIZE:
+            archive_file.seek(max(size - FINGERPRINT_SAMPLE_SIZE, FINGERPRINT_SAMPLE_SIZE))
+            digest.update(archive_file.read())
+    return digest.hexdigest()
+def archive_blake2(archive_path):
+    digest = hashlib.blake2b()
+    with open(archive_path, 'rb') as archive_file:
+        while True:
+            chunk = archive_file.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+def job_owner():
+    import socket
+    return f"{os.getpid()}@{socket.gethostname()}"
+def is_owner_alive(owner, heartbeat):
+    if not owner or heartbeat is None or time.time() - heartbeat > JOB_HEARTBEAT_TIMEOUT:
+        return False
+    import socket
+    pid, _, host = owner.partition("@")
+    if sys.platform == "win32" or host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        pass
+    return True
+class JobStore:
+    def __init__(self, path):
+        import sqlite3
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.owner = job_owner()
+        self.heartbeat_stop = threading.Event()
+        self.heartbeat_thread = None
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript(JOB_STORE_SCHEMA)
+            for table, column, column_type in JOB_STORE_COLUMNS:
+                if column not in [row["name"] for row in self.connection.execute(f"PRAGMA table_info({table})")]:
+                    self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+    def add(self, archive_path, repo_name, github_username, is_private, options):
+        now = time.time()
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT INTO jobs (archive_path, archive_hash, repo_name, github_username, is_private, options, state, owner, heartbeat, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (
+                    os.path.abspath(archive_path), archive_fingerprint(archive_path), repo_name, github_username, int(is_private), json.dumps(options),
+                    self.owner, now, now, now
+                )
+            )
+        self.start_heartbeat()
+        return cursor.lastrowid
+    def claim(self, record):
+        now = time.time()
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET owner = ?, heartbeat = ?, updated = ? WHERE id = ? AND owner IS ? AND heartbeat IS ? AND state IN ('queued', 'running')",
+                (self.owner, now, now, record["id"], record["owner"], record["heartbeat"])
+            )
+        if cursor.rowcount:
+            self.start_heartbeat()
+        return cursor.rowcount == 1
+    def start_heartbeat(self):
+        with self.lock:
+            if self.heartbeat_thread is None:
+                self.heartbeat_thread = threading.Thread(target=self.beat, daemon=True)
+                self.heartbeat_thread.start()
+    def beat(self):
+        while not self.heartbeat_stop.wait(JOB_HEARTBEAT_INTERVAL):
+            with self.lock:
+                self.connection.execute("UPDATE jobs SET heartbeat = ? WHERE owner = ? AND state IN ('queued', 'running')", (time.time(), self.owner))
+    def update(self, job_id, **fields):
+        fields["updated"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.lock:
+            self.connection.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+    def get(self, job_id):
+        with self.lock:
+            return self.connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    def find(self, archive_hash=None, repo_name=None, state=None):
+        conditions = [(column, value) for column, value in [("archive_hash", archive_hash), ("repo_name", repo_name), ("state", state)] if value is not None]
+        query = "SELECT * FROM jobs"
+        if conditions:
+            query += " WHERE " + " AND ".join(f"{column} = ?" for column, _ in conditions)
+        with self.lock:
+            return self.connection.execute(query + " ORDER BY id", [value for _, value in conditions]).fetchall()
+    def incomplete(self):
+        with self.lock:
+            records = self.connection.execute("SELECT * FROM jobs WHERE state IN ('queued', 'running') ORDER BY id").fetchall()
+        return [record for record in records if record["owner"] != self.owner and not is_owner_alive(record["owner"], record["heartbeat"])]
+    def close(self):
+        self.heartbeat_stop.set()
+        if self.heartbeat_thread:
+            self.heartbeat_thread.join()
+        with self.lock:
+            self.connection.close()
+def is_repo_url(url, github_username, repo_name):
+    return url.rstrip("/").lower().endswith(f"/{github_username}/{repo_name}".lower())
+class ArchiveCache:
+    def __init__(self, store):
+        self.store = store
+    def lookup(self, archive_path, options_key, github_username, repo_name):
+        with self.store.lock:
+            rows = self.store.connection.execute(
+                "SELECT * FROM archive_cache WHERE fingerprint = ? AND options_key = ? ORDER BY id DESC",
+                (archive_fingerprint(archive_path), options_key)
+            ).fetchall()
+        digest = None
+        confirmed = []
+        for row in rows:
+            cached = row["blake2"]
+            if cached is None:
+                if not self.unchanged(row):
+                    continue
+                cached = archive_blake2(row["archive_path"])
+                with self.store.lock:
+                    self.store.connection.execute("UPDATE archive_cache SET blake2 = ? WHERE id = ?", (cached, row["id"]))
+            digest = digest or archive_blake2(archive_path)
+            if cached == digest:
+                if is_repo_url(row["repo_url"], github_username, repo_name):
+                    return row
+                confirmed.append(row)
+        return confirmed[0] if confirmed else None
+    def unchanged(self, row):
+        try:
+            archive_stat = os.stat(row["archive_path"])
+        except OSError:
+            return False
+        return archive_stat.st_size == row["archive_size"] and archive_stat.st_mtime_ns == row["archive_mtime"]
+    def record(self, archive_path, options_key, tree_sha, commit_sha, repo_url, lfs_objects, blake2=None):
+        archive_stat = os.stat(archive_path)
+        blake2 = blake2 or archive_blake2(archive_path)
+        with self.store.lock:
+            self.store.connection.execute(
+                "INSERT INTO archive_cache (fingerprint, blake2, archive_path, archive_size, archive_mtime, options_key, tree_sha, commit_sha, repo_url, lfs_objects, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    archive_fingerprint(archive_path), blake2, os.path.abspath(archive_path), archive_stat.st_size, archive_stat.st_mtime_ns,
+                    options_key, tree_sha, commit_sha, repo_url, lfs_objects, time.time()
+                )
+            )
+    def forget(self, entry_id):
+        with self.store.lock:
+            self.store.connection.execute("DELETE FROM archive_cache WHERE id = ?", (entry_id,))
+def has_complete_history(git_dir, commit):
+    return subprocess.run(["git", "rev-list", "--objects", "--quiet", commit], cwd=git_dir, capture_output=True).returncode == 0
+def fetch_cached_commit(git_dir, url, commit):
+    if has_complete_history(git_dir, commit):
+        return True
+    result = subprocess.run(["git", "fetch", "--no-tags", url, commit], cwd=git_dir, capture_output=True, text=True)
+    if result.returncode != 0:
+        result = subprocess.run(["git", "fetch", "--no-tags", url, "HEAD"], cwd=git_dir, capture_output=True, text=True)
+    return result.returncode == 0 and has_complete_history(git_dir, commit)
+class PackIndex:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as index_file:
+            header = index_file.read(8 + 256 * 4)
+            if header[:8] != b"\377tOc" + struct.pack(">I", 2):
+                raise ValueError(f"Unsupported pack index: {path}")
+            self.count = struct.unpack_from(">256I", header, 8)[255]
+            self.names = index_file.read(20 * self.count)
+    def contains_any(self, names):
+        return any(self.names[offset:offset + 20] in names for offset in range(0, 20 * self.count, 20))
+class SharedObjectStore:
+    def __init__(self, path, max_size):
+        self.path = path
+        self.objects_dir = os.path.join(path, "objects")
+        self.pack_dir = os.path.join(self.objects_dir, "pack")
+        self.lock_path = os.path.join(path, OBJECT_STORE_GC_LOCK)
+        self.max_size = max_size
+        if not os.path.isdir(self.objects_dir):
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            subprocess.run(["git", "init", "--bare", "-q", path], check=True, capture_output=True)
+    def alternates_line(self):
+        return os.path.abspath(self.objects_dir).replace("\\", "/")
+    def packs(self):
+        if not os.path.isdir(self.pack_dir):
+            return []
+        return [
+            os.path.join(self.pack_dir, name) for name in os.listdir(self.pack_dir)
+            if name.endswith(".pack") and os.path.exists(os.path.join(self.pack_dir, name[:-5] + ".idx"))
+        ]
+    def lock_is_stale(self):
+        try:
+            return time.time() - os.path.getmtime(self.lock_path) > OBJECT_STORE_LOCK_STALE
+        except OSError:
+            return True
+    def borrow(self, git_dir):
+        info_dir = os.path.join(git_dir, "objects", "info")
+        os.makedirs(info_dir, exist_ok=True)
+        with open(os.path.join(info_dir, "alternates"), "w") as alternates_file:
+            alternates_file.write(self.alternates_line() + "\n")
+        while os.path.exists(self.lock_path) and not self.lock_is_stale():
+            time.sleep(0.2)
+    def absorb(self, git_dir, commits, base_commit=None):
+        subprocess.run(["git", "repack", "-a", "-d", "-l", "-q", "--window=0", "--no-write-bitmap-index"], cwd=git_dir, check=True, capture_output=True)
+        revisions = commits + ([f"^{base_commit}"] if base_commit else [])
+        output = subprocess.run(["git", "rev-list", "--objects", "--no-object-names", *revisions], cwd=git_dir, check=True, capture_output=True, text=True).stdout
+        names = {bytes.fromhex(line) for line in output.split()}
+        for pack in self.packs():
+            if PackIndex(pack[:-5] + ".idx").contains_any(names):
+                os.utime(pack)
+        pack_dir = os.path.join(git_dir, "objects", "pack")
+        os.makedirs(self.pack_dir, exist_ok=True)
+        for name in os.listdir(pack_dir):
+            base = name[:-5]
+            if not name.endswith(".pack") or os.path.exists(os.path.join(pack_dir, base + ".promisor")):
+                continue
+            for suffix in PACK_FILE_SUFFIXES:
+                source = os.path.join(pack_dir, base + suffix)
+                target = os.path.join(self.pack_dir, base + suffix)
+                if not os.path.exists(source):
+                    continue
+                if os.path.exists(target):
+                    os.remove(source)
+                else:
+                    shutil.move(source, target)
+            os.utime(os.path.join(self.pack_dir, name))
+    def has_borrowers(self, scratch_roots):
+        target = self.alternates_line()
+        for root in scratch_roots:
+            for name in os.listdir(root):
+                if not name.startswith(SCRATCH_PREFIX) or name.startswith(SCRATCH_TRASH_PREFIX):
+                    continue
+                for git_dir in [os.path.join(root, name, "repo"), os.path.join(root, name, "repo", ".git")]:
+                    try:
+                        with open(os.path.join(git_dir, "objects", "info", "alternates")) as alternates_file:
+                            if target in alternates_file.read().splitlines():
+                                return True
+                    except OSError:
+                        pass
+        return False
+    def collect(self, scratch_roots):
+        packs = self.packs()
+        total = sum(os.path.getsize(pack) for pack in packs)
+        if total <= self.max_size:
+            return 0
+        try:
+            os.close(os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            if self.lock_is_stale():
+                os.remove(self.lock_path)
+            return 0
+        try:
+            if self.has_borrowers(scratch_roots):
+                return 0
+            removed = 0
+            for pack in sorted(packs, key=os.path.getmtime):
+                if total <= self.max_size:
+                    break
+                total -= os.path.getsize(pack)
+                for suffix in reversed(PACK_FILE_SUFFIXES):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(pack[:-5] + suffix)
+                removed += 1
+            return removed
+        finally:
+            os.remove(self.lock_path)
+def run_recorded_job(store, job_id, job):
+    def on_stage(stage, values):
+        if stage == "remote_requested":
+            store.update(job_id, remote_requested=1)
+        elif "repo_url" in values:
+            store.update(job_id, stage=stage, repo_url=values["repo_url"])
+        else:
+            store.update(job_id, stage=stage)
+    job.on_stage = on_stage
+    store.update(job_id, state="running", error=None, owner=store.owner, heartbeat=time.time())
+    try:
+        repo_url = job.run()
+    except Exception as e:
+        store.update(job_id, state="failed", error=str(e))
+        raise
+    store.update(job_id, state="succeeded", repo_url=repo_url)
+    return repo_url
+def restore_job_arguments(record):
+    options = json.loads(record["options"])
+    options["reuse_remote"] = bool(record["remote_requested"] or record["repo_url"])
+    return (record["archive_path"], record["repo_name"], record["github_username"], bool(record["is_private"])), options
+class InotifyWatch:
+    def __init__(self, directory):
+        import ctypes
+        import ctypes.util
+        self.fd = -1
+        if not sys.platform.startswith("linux"):
+            return
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        except OSError:
+            return
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return
+        if libc.inotify_add_watch(fd, os.fsencode(directory), INOTIFY_CLOSE_WRITE | INOTIFY_MOVED_TO) < 0:
+            os.close(fd)
+            return
+        self.fd = fd
+    def wait(self, timeout):
+        import select
+        if self.fd < 0:
+            time.sleep(timeout)
+            return []
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            names.append(os.fsdecode(data[offset:offset + name_length].rstrip(b"\0")))
+            offset += name_length
+        return names
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+class FolderWatcher:
+    def __init__(self, directory, on_archive, debounce=WATCH_DEBOUNCE, poll_interval=WATCH_POLL_INTERVAL, include_existing=False):
+        self.directory = directory
+        self.on_archive = on_archive
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.candidates = {}
+        self.seen = set() if include_existing else {self.file_key(path) for path in self.scan()}
+        self.stopped = threading.Event()
+        self.thread = None
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    def stop(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+    def scan(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [os.path.join(self.directory, name) for name in names if is_archive_name(name)]
+    def file_key(self, path):
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            return None
+        return (path, file_stat.st_size, file_stat.st_mtime_ns)
+    def run(self):
+        watch = InotifyWatch(self.directory)
+        try:
+            next_scan = 0
+            while not self.stopped.is_set():
+                timeout = min(self.poll_interval, self.debounce) if self.candidates or watch.fd < 0 else self.poll_interval * 5
+                for name in watch.wait(timeout):
+                    if is_archive_name(name):
+                        self.track(os.path.join(self.directory, name))
+                if time.monotonic() >= next_scan:
+                    for path in self.scan():
+                        self.track(path)
+                    next_scan = time.monotonic() + (self.poll_interval if watch.fd < 0 else self.poll_interval * 5)
+                self.settle()
+        finally:
+            watch.close()
+    def track(self, path):
+        key = self.file_key(path)
+        if key is None or key in self.seen:
+            return
+        if self.candidates.get(path, (None,))[0] != key:
+            self.candidates[path] = (key, time.monotonic())
+    def settle(self):
+        now = time.monotonic()
+        for path, (key, since) in list(self.candidates.items()):
+            current = self.file_key(path)
+            if current != key:
+                del self.candidates[path]
+                if current is not None:
+                    self.candidates[path] = (current, now)
+                continue
+            if now - since >= self.debounce:
+                del self.candidates[path]
+                self.seen.add(key)
+                self.on_archive(path)
+class FastImportStream:
+    def __init__(self, git_dir, on_bytes=None):
+        self.on_bytes = on_bytes
+        self.stderr = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            ["git", "fast-import", "--quiet", "--done"],
+            cwd=git_dir, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self.stderr
+        )
+        self.stdin = self.process.stdin
+        self.next_mark = 1
+    def write_blob(self, member):
+        mark = self.next_mark
+        self.next_mark += 1
+        self.stdin.write(f"blob\nmark :{mark}\ndata {member.size}\n".encode())
+        remaining = member.size
+        with member.open() as source:
+            while remaining:
+                chunk = source.read(min(COPY_CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise ValueError(f"Archive member is truncated: {member.path}")
+                self.stdin.write(chunk)
+                remaining -= len(chunk)
+                if self.on_bytes:
+                    self.on_bytes(len(chunk))
+        self.stdin.write(b"\n")
+        return mark
+    def write_data(self, data):
+        mark = self.next_mark
+        self.next_mark += 1
+        self.stdin.write(f"blob\nmark :{mark}\ndata {len(data)}\n".encode())
+        self.stdin.write(data + b"\n")
+        return mark
+    def write_commit(self, ref, committer, message, files, parent=None, replace_tree=False):
+        encoded_message = message.encode("utf-8")
+        self.stdin.write(f"commit {ref}\ncommitter {committer}\ndata {len(encoded_message)}\n".encode())
+        self.stdin.write(encoded_message + b"\n")
+        if parent:
+            self.stdin.write(f"from {parent}\n".encode())
+        if replace_tree:
+            self.stdin.write(b"deleteall\n")
+        for path, (mode, mark) in files.items():
+            self.stdin.write(f"M {mode} :{mark} {quote_fast_import_path(path)}\n".encode("utf-8", "surrogateescape"))
+        self.stdin.write(b"\n")
+    def close(self):
+        try:
+            self.stdin.write(b"done\n")
+            self.stdin.close()
+        except BrokenPipeError:
+            pass
+        return_code = self.process.wait()
+        self.stderr.seek(0)
+        error_output = self.stderr.read().decode("utf-8", "replace").strip()
+        self.stderr.close()
+        if return_code != 0:
+            raise Exception(f"git fast-import failed: {error_output or return_code}")
+    def abort(self):
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.stderr.close()
+def quote_fast_import_path(path):
+    if path.startswith('"') or "\n" in path or "\\" in path:
+        return '"' + path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+    return path
+class UploadJob:
+    def __init__(
+        self, archive_path, repo_name, github_username, github_token, is_private,
+        engine="fast-import", extract_workers=None, scratch_dir=None, ram_budget=DEFAULT_RAM_BUDGET_MB * 1024 * 1024,
+        exclude_patterns=None, use_archive_gitignore=True,
+        use_lfs=True, lfs_threshold=DEFAULT_LFS_THRESHOLD_MB * 1024 * 1024, lfs_url=None, lfs_workers=DEFAULT_LFS_WORKERS,
+        object_format="pack", push_chunk_size=DEFAULT_PUSH_CHUNK_MB * 1024 * 1024, limits=None,
+        reuse_remote=False, update_existing=False, cache=None,
+        object_store=None, object_store_max_size=DEFAULT_OBJECT_STORE_MAX_MB * 1024 * 1024,
+        on_status=None, on_progress=None, on_stats=None, on_stage=None
+    ):
+        self.on_status = on_status or (lambda message: None)
+        self.on_progress = on_progress or (lambda percent: None)
+        self.on_stats = on_stats or (lambda text: None)
+        self.on_stage = on_stage or (lambda stage, values: None)
+        self.reuse_remote = reuse_remote
+        self.update_existing = update_existing
+        self.cache = cache
+        self.object_store_path = object_store
+        self.object_store_max_size = object_store_max_size
+        self.object_store = None
+        self.base_commit = None
+        self.target_ref = "refs/heads/master"
+        self.repo_url = None
+        self.archive_path = archive_path
+        self.repo_name = repo_name
+        self.github_username = github_username
+        self.github_token = github_token
+        self.is_private = is_private
+        self.engine = engine
+        self.extract_workers = extract_workers or os.cpu_count() or 1
+        self.scratch_dir = scratch_dir
+        self.ram_budget = ram_budget
+        self.exclude_patterns = DEFAULT_EXCLUDE_PATTERNS if exclude_patterns is None else exclude_patterns
+        self.use_archive_gitignore = use_archive_gitignore
+        self.exclude_rules = None
+        self.use_lfs = use_lfs
+        self.lfs_threshold = min(lfs_threshold, GITHUB_FILE_SIZE_LIMIT)
+        self.lfs_url = lfs_url
+        self.lfs_workers = lfs_workers
+        self.lfs_dir = None
+        self.lfs_objects = {}
+        self.lfs_paths = []
+        self.object_format = object_format
+        self.push_chunk_size = push_chunk_size
+        self.limits = limits or StageLimits()
+        self.commit_chunks = []
+        self.journal = None
+        self.resuming = False
+        self.remote_gate = threading.Event()
+        self.remote_allowed = False
+        self.temp_dir = None
+        self.archive_index = None
+        self.progress = None
+        self.job_lock = None
+    def run(self):
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            stages = FAST_IMPORT_STAGES if self.engine == "fast-import" else CHECKOUT_STAGES
+            self.progress = ProgressTracker(stages, self.on_progress, self.on_stats)
+            if self.object_store_path:
+                self.object_store = SharedObjectStore(self.object_store_path, self.object_store_max_size)
+            job_lock = JobLock(self.job_id())
+            if not job_lock.acquire():
+                raise Exception(f"This archive is already being uploaded to {self.github_username}/{self.repo_name} by another job")
+            self.job_lock = job_lock
+            self.temp_dir = find_job_dir(self.job_id(), job_scratch_roots(self.scratch_dir))
+            if self.temp_dir:
+                self.journal = JobJournal(os.path.join(self.temp_dir, JOB_JOURNAL_FILE))
+                self.resuming = True
+                self.on_status(f"Resuming previous upload at stage: {self.journal.next_stage()}")
+            if self.cache and not self.resuming and not self.update_existing:
+                cached = self.cache.lookup(self.archive_path, self.content_key(), self.github_username, self.repo_name)
+                repo_url = cached and self.upload_from_cache(cached, executor)
+                if repo_url:
+                    self.on_progress(100)
+                    return repo_url
+            remote = executor.submit(self.prepare_remote)
+            self.progress.abort_on_failure(remote)
+            with self.stage_slot(self.limits.cpu, "extraction"):
+                self.index_stage()
+                self.remote_allowed = True
+                self.remote_gate.set()
+            if self.update_existing and not self.journal.done("committed"):
+                self.wait_for_remote(remote)
+            repo_dir = os.path.join(self.temp_dir, "repo")
+            with self.stage_slot(self.limits.cpu, "extraction"):
+                if self.engine == "fast-import":
+                    repo = self.import_stage(repo_dir)
+                else:
+                    repo = self.checkout_stage(repo_dir)
+            commits = self.commits_to_push(repo)
+            repo_url = self.wait_for_remote(remote)
+            with self.stage_slot(self.limits.network, "upload"):
+                if self.journal.done("lfs_uploaded"):
+                    self.skip_stage("lfs")
+                else:
+                    self.upload_lfs_objects(repo_url)
+                    self.checkpoint("lfs_uploaded")
+                self.on_status("Pushing to GitHub...")
+                if "origin" in [remote.name for remote in repo.remotes]:
+                    repo.remote("origin").set_url(repo_url)
+                else:
+                    repo.create_remote("origin", repo_url)
+                self.push_commits(repo, commits)
+            self.checkpoint("pushed")
+            if self.cache and not self.base_commit:
+                self.cache.record(
+                    self.archive_path, self.content_key(), repo.git.rev_parse("refs/heads/master^{tree}"), repo.git.rev_parse("refs/heads/master"),
+                    repo_url, len(self.lfs_objects)
+                )
+            self.share_objects(repo.git_dir, commits[-1:], self.base_commit)
+            self.on_status("Cleaning up temporary files...")
+            self.cleanup()
+            self.collect_objects()
+            self.on_progress(100)
+            return repo_url
+        except Exception as e:
+            self.on_status(f"Error: {str(e)}")
+            if isinstance(e, TransientError) and self.journal and self.journal.data["stages"]:
+                self.on_status(f"Progress was saved after stage '{self.journal.data['stages'][-1]}'; upload the same archive again to resume.")
+            else:
+                self.cleanup()
+            raise
+        finally:
+            self.remote_gate.set()
+            executor.shutdown()
+            if self.job_lock:
+                self.job_lock.release()
+                self.job_lock = None
+    @contextlib.contextmanager
+    def stage_slot(self, semaphore, kind):
+        if not semaphore.acquire(blocking=False):
+            self.on_status(f"Waiting for a free {kind} slot...")
+            semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+    def content_key(self):
+        key = [sorted(self.exclude_patterns), self.use_archive_gitignore, self.use_lfs, self.lfs_threshold if self.use_lfs else None]
+        return hashlib.sha1(json.dumps(key).encode()).hexdigest()
+    def upload_from_cache(self, cached, executor):
+        import git
+        if is_repo_url(cached["repo_url"], self.github_username, self.repo_name):
+            response = get_api_client().github("GET", f"/repos/{self.github_username}/{self.repo_name}", self.github_token, self.on_status)
+            if response.status_code == 200:
+                self.on_status(f"This archive was already uploaded to {cached['repo_url']}, nothing to do")
+                return cached["repo_url"]
+            if response.status_code != 404:
+                raise Exception(f"Failed to check GitHub repository {self.github_username}/{self.repo_name}: {api_error_message(response)}")
+            self.cache.forget(cached["id"])
+            return None
+        if cached["lfs_objects"]:
+            self.on_status(f"An identical archive was uploaded to {cached['repo_url']}, but its LFS objects are not kept locally; uploading normally")
+            return None
+        self.on_status(f"An identical archive was uploaded to {cached['repo_url']}, copying its history instead of extracting")
+        try:
+            scratch_root = choose_scratch_dir(os.path.getsize(self.archive_path), self.ram_budget, self.scratch_dir)
+            self.temp_dir = tempfile.mkdtemp(prefix=SCRATCH_PREFIX, dir=scratch_root)
+            self.journal = JobJournal(os.path.join(self.temp_dir, JOB_JOURNAL_FILE))
+            repo = git.Repo.init(os.path.join(self.temp_dir, "repo"), bare=True)
+            self.borrow_objects(repo.git_dir)
+            available = fetch_cached_commit(repo.git_dir, cached["repo_url"], cached["commit_sha"])
+        except Exception as e:
+            self.on_status(f"Could not reuse the earlier upload ({str(e)}), uploading normally")
+            available = None
+        if not available:
+            if available is not None:
+                self.on_status("The earlier upload is no longer available, uploading normally")
+                self.cache.forget(cached["id"])
+            self.cleanup()
+            self.temp_dir = None
+            self.journal = None
+            return None
+        try:
+            self.remote_allowed = True
+            self.remote_gate.set()
+            remote = executor.submit(self.prepare_remote)
+            for stage in ["index", "import", "extract", "commit"]:
+                if stage in self.progress.weights:
+                    self.skip_stage(stage)
+            repo_url = self.wait_for_remote(remote)
+            repo.create_remote("origin", repo_url)
+            with self.stage_slot(self.limits.network, "upload"):
+                self.skip_stage("lfs")
+                self.push_commits(repo, repo.git.rev_list("--reverse", cached["commit_sha"]).split())
+            self.cache.record(self.archive_path, cached["options_key"], cached["tree_sha"], cached["commit_sha"], repo_url, 0, cached["blake2"])
+            self.share_objects(repo.git_dir, [cached["commit_sha"]])
+        except BaseException:
+            self.cleanup()
+            self.journal = None
+            raise
+        self.cleanup()
+        self.collect_objects()
+        return repo_url
+    def borrow_objects(self, git_dir):
+        if self.object_store:
+            self.object_store.borrow(git_dir)
+    def share_objects(self, git_dir, commits, base_commit=None):
+        if not self.object_store or not commits:
+            return
+        try:
+            self.object_store.absorb(git_dir, commits, base_commit)
+        except Exception as e:
+            self.on_status(f"Warning: Failed to add objects to the shared object store: {str(e)}")
+    def collect_objects(self):
+        if not self.object_store:
+            return
+        try:
+            removed = self.object_store.collect(job_scratch_roots(self.scratch_dir))
+        except Exception as e:
+            self.on_status(f"Warning: Failed to trim the shared object store: {str(e)}")
+            return
+        if removed:
+            self.on_status(f"Removed {removed} least recently used packs from the shared object store")
+    def wait_for_remote(self, remote):
+        if self.repo_url is None:
+            self.progress.start("remote")
+            self.repo_url = remote.result()
+            self.checkpoint("remote_created", repo_url=self.repo_url)
+            self.progress.finish()
+        return self.repo_url
+    def fetch_base(self, repo):
+        if not self.update_existing:
+            return
+        self.on_status("Fetching the current tree of the existing repository...")
+        self.base_commit, head_ref = fetch_base_commit(repo.git_dir, self.repo_url)
+        self.target_ref = head_ref or self.target_ref
+        if self.base_commit is None:
+            self.on_status("The existing repository is empty, uploading everything")
+    def commits_to_push(self, repo):
+        if not self.base_commit:
+            return repo.git.rev_list("--reverse", "refs/heads/master").split()
+        changes = repo.git.diff_tree("-r", "--no-renames", "--name-status", self.base_commit, "refs/heads/master").splitlines()
+        if not changes:
+            self.on_status("The repository already matches this archive, nothing to push")
+            return []
+        counts = {status: sum(1 for change in changes if change.startswith(status)) for status in "AMD"}
+        self.on_status(f"Pushing only the changes: {counts['A']} added, {counts['M']} modified, {counts['D']} deleted")
+        return repo.git.rev_list("--reverse", f"{self.base_commit}..refs/heads/master").split()
+    def commit_message(self, number, count):
+        if self.base_commit:
+            return f"Update from {os.path.basename(self.archive_path)}"
+        return chunk_commit_message(number, count)
+    def job_id(self):
+        archive_stat = os.stat(self.archive_path)
+        key = "|".join(str(part) for part in [
+            os.path.abspath(self.archive_path), archive_stat.st_size, archive_stat.st_mtime_ns,
+            self.github_username, self.repo_name, self.engine, self.object_format
+        ] + (["update"] if self.update_existing else []))
+        return hashlib.sha1(key.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    def checkpoint(self, stage, **values):
+        self.journal.mark(stage, **values)
+        self.on_stage(stage, values)
+    def skip_stage(self, stage):
+        self.progress.start(stage)
+        self.progress.finish()
+    def index_stage(self):
+        if self.journal and self.journal.done("indexed"):
+            self.skip_stage("index")
+            self.archive_index = ArchiveIndex.load(os.path.join(self.temp_dir, JOB_INDEX_FILE))
+            self.exclude_rules = build_exclude_rules(self.exclude_patterns, self.archive_index.gitignores if self.use_archive_gitignore else {})
+            return
+        self.on_status(f"Indexing {self.archive_path}...")
+        self.progress.start("index")
+        self.archive_index = build_archive_index(self.archive_path)
+        self.check_archive_index()
+        if self.temp_dir is None:
+            self.on_status("Creating temporary directory...")
+            self.temp_dir = self.create_scratch_dir()
+            self.journal = JobJournal(os.path.join(self.temp_dir, JOB_JOURNAL_FILE))
+        self.archive_index.save(os.path.join(self.temp_dir, JOB_INDEX_FILE))
+        self.checkpoint("indexed", archive=os.path.abspath(self.archive_path), repo_name=self.repo_name)
+        self.progress.finish()
+    def import_stage(self, repo_dir):
+        import git
+        if self.journal.done("committed"):
+            self.skip_stage("import")
+            repo = git.Repo(repo_dir)
+            self.restore_lfs_state(repo)
+            self.base_commit = self.journal.data.get("base_commit")
+            self.target_ref = self.journal.data.get("target_ref", self.target_ref)
+            return repo
+        self.on_status("Initializing bare Git repository...")
+        shutil.rmtree(repo_dir, ignore_errors=True)
+        repo = git.Repo.init(repo_dir, bare=True)
+        self.borrow_objects(repo.git_dir)
+        self.lfs_dir = os.path.join(repo.git_dir, "lfs")
+        self.fetch_base(repo)
+        self.on_status(f"Streaming {self.archive_path} into Git...")
+        self.progress.start("import", self.archive_index.total_size)
+        self.import_archive(repo)
+        self.checkpoint("extracted", **self.lfs_state())
+        self.checkpoint("committed", commit_chunks=self.commit_chunks, base_commit=self.base_commit, target_ref=self.target_ref)
+        self.progress.finish()
+        return repo
+    def checkout_stage(self, repo_dir):
+        import git
+        entries_path = os.path.join(self.temp_dir, JOB_ENTRIES_FILE)
+        if self.journal.done("extracted"):
+            self.skip_stage("extract")
+            repo = git.Repo(repo_dir)
+            self.restore_lfs_state(repo)
+            self.base_commit = self.journal.data.get("base_commit")
+            self.target_ref = self.journal.data.get("target_ref", self.target_ref)
+            with open(entries_path) as entries_file:
+                entries = {path: tuple(entry) for path, entry in json.load(entries_file).items()}
+        else:
+            self.on_status("Initializing Git repository...")
+            shutil.rmtree(repo_dir, ignore_errors=True)
+            repo = git.Repo.init(repo_dir)
+            self.borrow_objects(repo.git_dir)
+            self.lfs_dir = os.path.join(repo.git_dir, "lfs")
+            self.fetch_base(repo)
+            self.on_status(f"Extracting {self.archive_path} to temporary directory...")
+            self.progress.start("extract", self.archive_index.total_size)
+            store = open_object_store(os.path.join(repo.git_dir, "objects"), self.object_format)
+            try:
+                entries = self.extract_archive(self.archive_path, repo_dir, store)
+                attributes = self.write_lfs_attributes(repo_dir)
+                if attributes is not None:
+                    entries[".gitattributes"] = (GIT_FILE_MODE, write_object(store, attributes))
+            except BaseException:
+                store.abort()
+                raise
+            store.finish()
+            write_json_atomic(entries_path, entries)
+            self.checkpoint("extracted", base_commit=self.base_commit, target_ref=self.target_ref, **self.lfs_state())
+            self.progress.finish()
+        if self.journal.done("committed"):
+            self.skip_stage("commit")
+            self.commit_chunks = [tuple(chunk) for chunk in self.journal.data.get("commit_chunks", [])]
+            return repo
+        self.on_status("Writing trees and commits...")
+        self.progress.start("commit")
+        store = open_object_store(os.path.join(repo.git_dir, "objects"), self.object_format)
+        try:
+            commits = self.write_commit_chain(store, entries, self.get_committer(repo))
+        except BaseException:
+            store.abort()
+            raise
+        store.finish()
+        repo.git.update_ref("refs/heads/master", commits[-1])
+        repo.git.symbolic_ref("HEAD", "refs/heads/master")
+        self.on_status(f"Adding {len(entries)} hashed files to the Git index...")
+        update_git_index(repo.working_tree_dir, entries)
+        self.checkpoint("committed", commit_chunks=self.commit_chunks, base_commit=self.base_commit, target_ref=self.target_ref)
+        self.progress.finish()
+        return repo
+    def lfs_state(self):
+        return {"lfs_objects": self.lfs_objects, "lfs_paths": self.lfs_paths}
+    def restore_lfs_state(self, repo):
+        self.lfs_dir = os.path.join(repo.git_dir, "lfs")
+        self.lfs_objects = {oid: tuple(lfs_object) for oid, lfs_object in self.journal.data.get("lfs_objects", {}).items()}
+        self.lfs_paths = self.journal.data.get("lfs_paths", [])
+    def check_archive_index(self):
+        index = self.archive_index
+        self.exclude_rules = build_exclude_rules(self.exclude_patterns, index.gitignores if self.use_archive_gitignore else {})
+        index.apply_excludes(self.exclude_rules)
+        self.on_status(f"Indexed {index.file_count} files ({index.total_size / (1024 * 1024):.1f} MB uncompressed, {index.archive_format.name})")
+        if index.excluded_count:
+            self.on_status(f"Skipping {index.excluded_count} excluded files ({index.excluded_size / (1024 * 1024):.1f} MB)")
+        if self.use_lfs:
+            lfs_entries = [entry for entry in index.oversized_entries(self.lfs_threshold) if entry.mode != GIT_LINK_MODE]
+            if lfs_entries:
+                self.on_status(f"{len(lfs_entries)} large files ({sum(entry.size for entry in lfs_entries) / (1024 * 1024):.1f} MB) will be stored in Git LFS")
+            return
+        oversized = index.oversized_entries(GITHUB_FILE_SIZE_LIMIT)
+        if oversized:
+            names = ", ".join(entry.path for entry in oversized[:5])
+            raise ValueError(f"{len(oversized)} file(s) exceed GitHub's 100 MB limit: {names}")
+    def create_scratch_dir(self):
+        uncompressed_size = self.archive_index.total_size
+        scratch_root = choose_scratch_dir(uncompressed_size, self.ram_budget, self.scratch_dir)
+        if scratch_root == RAM_SCRATCH_DIR:
+            self.on_status(f"Using in-memory scratch space ({uncompressed_size / (1024 * 1024):.1f} MB uncompressed)")
+        required = uncompressed_size * DISK_SPACE_HEADROOM
+        if self.engine != "fast-import":
+            required += os.path.getsize(self.archive_path)
+        free_space = shutil.disk_usage(scratch_root or tempfile.gettempdir()).free
+        if free_space < required:
+            raise Exception(f"Not enough free space for scratch files: need {required / (1024 * 1024):.0f} MB, {free_space / (1024 * 1024):.0f} MB available")
+        job_dir = os.path.join(scratch_root or tempfile.gettempdir(), f"{SCRATCH_PREFIX}job-{self.job_id()}")
+        shutil.rmtree(job_dir, ignore_errors=True)
+        os.makedirs(job_dir)
+        return job_dir
+    def import_archive(self, repo):
+        stream = FastImportStream(repo.git_dir, self.progress.advance)
+        try:
+            files = {}
+            attributes = None
+            for member in iter_archive_members(self.archive_path):
+                if self.exclude_rules.excluded(member.path):
+                    continue
+                if member.hardlink_to is not None:
+                    if member.hardlink_to in files:
+                        files[member.path] = (member.mode, files[member.hardlink_to][1])
+                    continue
+                if member.path == ".gitattributes" and member.mode != GIT_LINK_MODE:
+                    with member.open() as source:
+                        attributes = source.read()
+                    self.progress.advance(member.size)
+                elif self.is_lfs_member(member.mode, member.size):
+                    with member.open() as source:
+                        pointer = self.store_lfs_member(source, member.path, member.size)
+                    files[member.path] = (member.mode, stream.write_data(pointer))
+                else:
+                    files[member.path] = (member.mode, stream.write_blob(member))
+            attributes = self.merge_lfs_attributes(attributes)
+            if attributes is not None:
+                files[".gitattributes"] = (GIT_FILE_MODE, stream.write_data(attributes))
+            committer = self.get_committer(repo)
+            self.commit_chunks = plan_commit_chunks(files, self.entry_sizes(), 0 if self.base_commit else self.push_chunk_size)
+            for number, (paths, _) in enumerate(self.commit_chunks, 1):
+                chunk_files = {path: files[path] for path in paths}
+                stream.write_commit(
+                    "refs/heads/master", committer, self.commit_message(number, len(self.commit_chunks)), chunk_files,
+                    self.base_commit, self.base_commit is not None
+                )
+        except BrokenPipeError:
+            stream.close()
+            raise
+        except BaseException:
+            stream.abort()
+            raise
+        stream.close()
+    def entry_sizes(self):
+        lfs_paths = set(self.lfs_paths)
+        return {entry.path: entry.size for entry in self.archive_index.entries if entry.path not in lfs_paths}
+    def write_commit_chain(self, store, entries, ident):
+        self.commit_chunks = plan_commit_chunks(entries, self.entry_sizes(), 0 if self.base_commit else self.push_chunk_size)
+        commits = []
+        tree_entries = {}
+        for number, (paths, _) in enumerate(self.commit_chunks, 1):
+            tree_entries.update((path, entries[path]) for path in paths)
+            parent = commits[-1] if commits else self.base_commit
+            commits.append(write_commit_object(store, write_tree_objects(store, tree_entries), ident, self.commit_message(number, len(self.commit_chunks)), parent))
+        return commits
+    def push_commits(self, repo, commits):
+        checkpoint_path = os.path.join(repo.git_dir, PUSH_CHECKPOINT_FILE)
+        state = {"commits": commits, "pushed": 0}
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as checkpoint_file:
+                saved = json.load(checkpoint_file)
+            if saved.get("commits") == commits:
+                state = saved
+        push_bytes = repo_object_bytes(repo.git_dir)
+        chunk_sizes = [size for _, size in self.commit_chunks] if len(self.commit_chunks) == len(commits) else [1] * len(commits)
+        total_size = sum(chunk_sizes) or 1
+        self.progress.start("push", push_bytes)
+        pushed_bytes = sum(chunk_sizes[:state["pushed"]]) * push_bytes // total_size
+        for number in range(state["pushed"], len(commits)):
+            chunk_bytes = chunk_sizes[number] * push_bytes // total_size
+            if len(commits) > 1:
+                self.on_status(f"Pushing part {number + 1} of {len(commits)}...")
+            for attempt in range(1, PUSH_ATTEMPTS + 1):
+                try:
+                    run_git_with_progress(
+                        ["push", "origin", f"{commits[number]}:{self.target_ref}"], repo.git_dir,
+                        lambda fraction: self.progress.update(pushed_bytes + int(fraction * chunk_bytes))
+                    )
+                    break
+                except Exception as e:
+                    if attempt == PUSH_ATTEMPTS:
+                        raise TransientError(f"Push of part {number + 1} failed: {e}")
+                    self.on_status(f"Push of part {number + 1} failed ({e}), retrying...")
+                    time.sleep(PUSH_RETRY_DELAY * attempt)
+            pushed_bytes += chunk_bytes
+            state["pushed"] = number + 1
+            with open(checkpoint_path, "w") as checkpoint_file:
+                json.dump(state, checkpoint_file)
+        self.progress.finish()
+    def is_lfs_member(self, mode, size):
+        return self.use_lfs and mode != GIT_LINK_MODE and size > self.lfs_threshold
+    def store_lfs_member(self, source, path, size):
+        oid, object_path = store_lfs_object(self.lfs_dir, source, size, self.progress.advance)
+        self.lfs_objects[oid] = (size, object_path)
+        self.lfs_paths.append(path)
+        return lfs_pointer(oid, size)
+    def merge_lfs_attributes(self, attributes):
+        if not self.lfs_paths:
+            return attributes
+        lines = "".join(lfs_attributes_line(path) for path in sorted(set(self.lfs_paths))).encode("utf-8", "surrogateescape")
+        if attributes and not attributes.endswith(b"\n"):
+            attributes += b"\n"
+        return (attributes or b"") + lines
+    def write_lfs_attributes(self, worktree):
+        attributes_path = os.path.join(worktree, ".gitattributes")
+        if not self.lfs_paths or os.path.islink(attributes_path):
+            return None
+        attributes = None
+        if os.path.exists(attributes_path):
+            with open(attributes_path, 'rb') as attributes_file:
+                attributes = attributes_file.read()
+        attributes = self.merge_lfs_attributes(attributes)
+        with open(attributes_path, 'wb') as attributes_file:
+            attributes_file.write(attributes)
+        return attributes
+    def upload_lfs_objects(self, repo_url):
+        if not self.lfs_objects:
+            return
+        lfs_url = self.lfs_url or f"{repo_url}.git/info/lfs"
+        total = sum(size for size, _ in self.lfs_objects.values())
+        self.on_status(f"Uploading {len(self.lfs_objects)} LFS objects ({total / (1024 * 1024):.1f} MB)...")
+        self.progress.start("lfs", total)
+        client = LfsClient(lfs_url, self.github_username, self.github_token, self.lfs_workers)
+        uploaded = client.upload(self.lfs_objects, self.progress.advance)
+        self.progress.finish()
+        self.on_status(f"Uploaded {uploaded} LFS objects, {len(self.lfs_objects) - uploaded} already present")
+    def get_committer(self, repo):
+        import git
+        try:
+            return repo.git.var("GIT_COMMITTER_IDENT")
+        except git.GitCommandError:
+            return f"{self.github_username} <{self.github_username}@users.noreply.github.com> {int(time.time())} +0000"
+    def extract_archive(self, archive_path, extract_to, store):
+        import zipfile
+        archive_format = detect_archive_format(archive_path)
+        entries = {}
+        if archive_format.container == "zip" and self.extract_workers > 1:
+            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+                infos = [info for info in zip_ref.infolist() if not info.is_dir() and not self.member_excluded(info.filename)]
+            infos = [info for info in infos if not self.is_lfs_member(zip_info_mode(info), info.file_size)]
+            compressed_size = sum(info.compress_size for info in infos)
+            if len(infos) >= PARALLEL_EXTRACT_MIN_MEMBERS or compressed_size >= PARALLEL_EXTRACT_MIN_BYTES:
+                for path, mode, sha, size in self.extract_zip_parallel(archive_path, infos, extract_to, store):
+                    entries[path] = (mode, sha)
+                parallel_names = {info.filename for info in infos}
+                self.extract_members(iter_zip_members(archive_path, lambda info: info.filename not in parallel_names), extract_to, store, entries)
+                return entries
+        self.extract_members(archive_format.iter_members(archive_path), extract_to, store, entries)
+        return entries
+    def extract_members(self, members, extract_to, store, entries):
+        pipeline = MemberPipeline(members, lambda member: not self.exclude_rules.excluded(member.path))
+        checked_dirs = set()
+        try:
+            for member, reader in pipeline:
+                target = worktree_target(extract_to, member.path, checked_dirs)
+                if member.hardlink_to is not None:
+                    if member.hardlink_to in entries:
+                        entries[member.path] = entries[member.hardlink_to]
+                        source_path = os.path.join(extract_to, *member.hardlink_to.split("/"))
+                        try:
+                            os.link(source_path, target)
+                        except OSError:
+                            shutil.copy2(source_path, target, follow_symlinks=False)
+                elif self.is_lfs_member(member.mode, member.size):
+                    pointer = self.store_lfs_member(reader, member.path, member.size)
+                    entries[member.path] = (member.mode, write_worktree_blob(io.BytesIO(pointer), len(pointer), member.mode, target, store))
+                else:
+                    entries[member.path] = (member.mode, write_worktree_blob(reader, member.size, member.mode, target, store, self.progress.advance))
+        finally:
+            pipeline.stop()
+    def member_excluded(self, name):
+        path = normalize_member_path(name)
+        return path is None or self.exclude_rules.excluded(path)
+    def extract_zip_parallel(self, archive_path, infos, extract_to, store):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        units = split_zip_work_units(infos, self.extract_workers * UNITS_PER_EXTRACT_WORKER)
+        self.on_status(f"Extracting {len(infos)} members in {len(units)} work units on {self.extract_workers} processes...")
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.extract_workers, mp_context=context) as executor:
+            futures = [executor.submit(extract_zip_work_unit, archive_path, names, extract_to, store.objects_dir, self.object_format) for names in units]
+            for future in as_completed(futures):
+                unit_entries = future.result()
+                self.progress.advance(sum(size for _, _, _, size in unit_entries))
+                yield from unit_entries
+    def prepare_remote(self):
+        if self.journal and self.journal.done("remote_created"):
+            return self.journal.data["repo_url"]
+        with self.stage_slot(self.limits.network, "GitHub API"):
+            self.validate_github_token()
+            existing = get_api_client().github("GET", f"/repos/{self.github_username}/{self.repo_name}", self.github_token, self.on_status)
+        if existing.status_code not in [200, 404]:
+            error = TransientError if existing.status_code >= 500 else Exception
+            raise error(f"Failed to check GitHub repository {self.github_username}/{self.repo_name}: {api_error_message(existing)}")
+        reusable = self.reuse_remote or (self.resuming and self.journal.data.get("remote_requested"))
+        if existing.status_code == 200 and not reusable and not self.update_existing:
+            raise Exception(f"Repository {self.github_username}/{self.repo_name} already exists; enable update mode to upload only the changes")
+        self.remote_gate.wait()
+        if not self.remote_allowed:
+            return None
+        if existing.status_code == 200 and self.update_existing:
+            self.on_status("Repository already exists, only the changes will be uploaded")
+            return existing.json()["html_url"]
+        if existing.status_code == 200:
+            self.on_status("Repository already exists from the previous attempt, reusing it")
+            return existing.json()["html_url"]
+        self.on_status(f"Creating GitHub repository: {self.repo_name}...")
+        self.journal.note(remote_requested=True)
+        self.on_stage("remote_requested", {})
+        with self.stage_slot(self.limits.network, "GitHub API"):
+            return self.create_github_repo()
+    def validate_github_token(self):
+        response = get_api_client().github("GET", "/user", self.github_token, self.on_status)
+        if response.status_code == 401:
+            raise Exception("GitHub rejected the token; check that it is valid and has not expired")
+        if response.status_code != 200:
+            raise Exception(f"Failed to validate GitHub token: {response.json().get('message', response.text)}")
+        login = response.json().get("login", "")
+        if login.lower() != self.github_username.lower():
+            raise Exception(f"The GitHub token belongs to '{login}', not '{self.github_username}'")
+        scopes = [scope.strip() for scope in response.headers.get("X-OAuth-Scopes", "").split(",") if scope.strip()]
+        if scopes and "repo" not in scopes and (self.is_private or "public_repo" not in scopes):
+            raise Exception(f"The GitHub token is missing the '{'repo' if self.is_private else 'public_repo'}' scope")
+    def create_github_repo(self):
+        data = {
+            "name": self.repo_name,
+            "private": self.is_private
+        }
+        response = get_api_client().github("POST", "/user/repos", self.github_token, self.on_status, data=json.dumps(data))
+        if response.status_code not in [200, 201]:
+            raise Exception(f"Failed to create GitHub repository: {response.json().get('message', response.text)}")
+        return response.json()["html_url"]
+    def cleanup(self):
+        if self.temp_dir and os.path.exists(self.temp_dir):
+            try:
+                SCRATCH_REAPER.discard(self.temp_dir)
+            except Exception as e:
+                self.on_status(f"Warning: Failed to clean up temporary directory: {str(e)}")
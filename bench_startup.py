@@ -0,0 +1,55 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = {"PyQt6.QtWidgets", "git", "requests", "AutoGitUploaderCore", "zipfile", "tarfile", "lzma", "multiprocessing"}
+FIRST_PAINT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {here!r})
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QEvent, QTimer
+import AutoGitUploader
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            print(time.time(), flush=True)
+            QTimer.singleShot(0, app.quit)
+            obj.removeEventFilter(self)
+        return False
+app = QApplication(sys.argv)
+window = AutoGitUploader.AutoGitUploader()
+paint_filter = FirstPaint()
+window.installEventFilter(paint_filter)
+window.show()
+app.exec()
+"""
+def measure_first_paint():
+    started = time.time()
+    result = subprocess.run([sys.executable, "-c", FIRST_PAINT_SCRIPT.format(here=HERE)], capture_output=True, text=True, check=True)
+    return float(result.stdout.split()[0]) - started
+def measure_import_time(module):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=HERE, capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            cumulative[fields[2].strip()] = int(fields[1])
+    return cumulative.get(module, 0) / 1e6, sorted(name for name in cumulative if name in HEAVY_MODULES)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure AutoGitUploader cold-start time.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-gui", action="store_true", help="skip the time-to-first-paint measurement")
+    args = parser.parse_args(argv)
+    report = {}
+    for module in ["AutoGitUploader", "AutoGitUploaderCore", "AutoGitUploaderCLI"]:
+        samples = [measure_import_time(module) for _ in range(args.runs)]
+        report[module] = {"import_s": statistics.median(total for total, _ in samples), "heavy_modules": samples[0][1]}
+    if not args.no_gui:
+        report["first_paint_s"] = statistics.median(measure_first_paint() for _ in range(args.runs))
+    print(json.dumps(report, indent=2))
+if __name__ == "__main__":
+    main()